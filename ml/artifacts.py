@@ -0,0 +1,187 @@
+"""
+Model artifact bundle: manifest.json + one file per model in its library's native format
+  manifest.json   features, metrics, params and per-model file/format entries (written last)
+  scaler.joblib   the one shared scaler
+  rf.joblib       the sklearn forest (uncompressed pickle)
+  xgb.ubj         XGBoost UBJSON
+  lgb.txt         LightGBM text model
+  <name>.nodes/   every model's compiled node arrays as .npy, memory-mapped on load
+Each model is read on first access, so a consumer that only asks for LGB never unpickles
+the forest, and engine='numpy' scoring never deserializes a model at all. Output dirs
+without a manifest are read in the older layout of one <name>.joblib pickle per model
+
+Cold start is import-bound, not read-bound: reading any native model imports its library,
+and lightgbm and xgboost each import sklearn, scipy and pandas on the way (about 2s here),
+so loading LGB alone costs about as much as loading all three. Only the node arrays avoid
+that: this module, ml.inference and the .nodes files need nothing but NumPy, which is why
+the bundle constants live here rather than in ml.features (which imports pandas)
+"""
+import json
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+OUT_DIR = Path(__file__).resolve().parents[1] / 'ml_output'
+MODEL_NAMES = ('rf', 'xgb', 'lgb')
+# Tree ensembles are invariant to feature scaling, so they train on the raw fold matrices
+NEEDS_SCALING = {'rf': False, 'xgb': False, 'lgb': False}
+
+MANIFEST = 'manifest.json'
+BUNDLE_FORMAT = 1
+MODEL_FILES = {'rf': ('rf.joblib', 'joblib'), 'xgb': ('xgb.ubj', 'xgboost-ubj'), 'lgb': ('lgb.txt', 'lightgbm-text')}
+
+
+def _save_model(name: str, model, path: Path):
+    if name == 'xgb':
+        model.save_model(path)
+    elif name == 'lgb':
+        getattr(model, 'booster_', model).save_model(str(path))
+    else:
+        from joblib import dump
+        dump(model, path)
+
+
+def _load_model(fmt: str, path: Path):
+    if fmt == 'xgboost-ubj':
+        from xgboost import XGBRegressor
+        model = XGBRegressor()
+        model.load_model(path)
+        return model
+    if fmt == 'lightgbm-text':
+        # A bare Booster: the inference and incremental-update code accept it like LGBMRegressor.
+        # model_str, not model_file: the file path re-scans the text in Python for pandas categoricals
+        import lightgbm
+        return lightgbm.Booster(model_str=path.read_text(encoding='utf-8'))
+    if fmt == 'joblib':
+        # Plain load: sklearn trees copy their node arrays on unpickle, so mmap_mode only adds
+        # per-array overhead here; the memory-mapped copy of the forest is the .nodes dir
+        from joblib import load
+        return load(path)
+    raise ValueError(f"Unknown model format: {fmt}")
+
+
+def _save_nodes(forest, path: Path) -> Dict:
+    path.mkdir(parents=True, exist_ok=True)
+    for key, array in forest.arrays().items():
+        np.save(path / f'{key}.npy', np.ascontiguousarray(array))
+    return dict(forest.attrs(), dir=path.name)
+
+
+def _load_nodes(entry: Dict, out_dir: Path):
+    from ml.inference import CompiledForest
+    path = out_dir / entry['dir']
+    arrays = {key: np.load(path / f'{key}.npy', mmap_mode='r') for key in CompiledForest.ARRAYS}
+    return CompiledForest(**arrays, depth=entry['depth'], strict=entry['strict'],
+                          scale=entry['scale'], bias=entry['bias'])
+
+
+def save_bundle(models: Dict, scaler, features: Iterable[str], out_dir: Path,
+                metrics: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
+    """Write every model, its node arrays and the scaler, then the manifest; returns the manifest"""
+    from joblib import dump
+    from ml.inference import compile_model
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dump(scaler, out_dir / 'scaler.joblib')
+    entries = {}
+    for name, model in models.items():
+        file, fmt = MODEL_FILES[name]
+        _save_model(name, model, out_dir / file)
+        entries[name] = {'file': file, 'format': fmt, 'bytes': (out_dir / file).stat().st_size,
+                         'params': (params or {}).get(name),
+                         'nodes': _save_nodes(compile_model(name, model), out_dir / f'{name}.nodes')}
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'features': list(features),
+        'metrics': metrics or {},
+        'scaler': 'scaler.joblib',
+        'models': entries,
+    }
+    # Manifest last: a reader never sees it point at files that are not written yet
+    tmp = out_dir / (MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(out_dir / MANIFEST)
+    return manifest
+
+
+class _LazyModels(Mapping):
+    """name -> model, loaded on first lookup and kept"""
+
+    def __init__(self, names: List[str], load):
+        self._names = names
+        self._load = load
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._loaded:
+            self._loaded[name] = self._load(name)
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+class ModelBundle:
+    """Read side of a saved bundle (or of the older one-pickle-per-model layout)"""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        try:
+            with open(self.out_dir / MANIFEST, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = None
+        self._scaler = None
+
+    @property
+    def names(self) -> List[str]:
+        if self.manifest is not None:
+            return list(self.manifest['models'])
+        return [name for name in MODEL_FILES if (self.out_dir / f'{name}.joblib').exists()]
+
+    @property
+    def features(self) -> Optional[List[str]]:
+        return self.manifest['features'] if self.manifest else None
+
+    @property
+    def metrics(self) -> Dict:
+        return self.manifest['metrics'] if self.manifest else {}
+
+    def has(self, names: Iterable[str]) -> bool:
+        return set(names) <= set(self.names)
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from joblib import load
+            self._scaler = load(self.out_dir / 'scaler.joblib')
+        return self._scaler
+
+    def load_model(self, name: str):
+        if self.manifest is None:
+            return _load_model('joblib', self.out_dir / f'{name}.joblib')
+        entry = self.manifest['models'][name]
+        return _load_model(entry['format'], self.out_dir / entry['file'])
+
+    def load_forest(self, name: str):
+        entry = self.manifest['models'][name].get('nodes') if self.manifest else None
+        if entry is None:
+            from ml.inference import compile_model
+            return compile_model(name, self.load_model(name))
+        return _load_nodes(entry, self.out_dir)
+
+    def models(self, names: Iterable[str] = None) -> Mapping:
+        """Lazy name -> model mapping"""
+        return _LazyModels(list(names or self.names), self.load_model)
+
+    def forests(self, names: Iterable[str] = None) -> Mapping:
+        """Lazy name -> CompiledForest mapping over the memory-mapped node arrays"""
+        return _LazyModels(list(names or self.names), self.load_forest)
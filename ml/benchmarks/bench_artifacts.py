@@ -0,0 +1,86 @@
+"""
+Benchmark: artifact size and cold-start load time, one joblib pickle per model vs the bundle
+Each load runs in a fresh interpreter and the clock starts before any import, so the time includes
+loading whichever model libraries that path needs; the last column lists the heavy ones it imported.
+Needs trained models in ml_output (python ml/train.py)
+
+Run with: python -m ml.benchmarks.bench_artifacts [--repeat 5]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from joblib import dump
+from ml.artifacts import ModelBundle
+from ml.features import MODEL_NAMES, OUT_DIR, ROOT
+
+BUNDLE = "from ml.artifacts import ModelBundle\nb = ModelBundle(d)\n"
+LOADERS = {
+    'pickles, all models': "from joblib import load\n"
+                           "scaler = load(d / 'scaler.joblib')\n"
+                           "models = [load(d / f'{n}.joblib') for n in ('rf', 'xgb', 'lgb')]",
+    'bundle, all models': BUNDLE + "models = [b.models()[n] for n in b.names]",
+    'bundle, lgb only': BUNDLE + "model = b.models(['lgb'])['lgb']",
+    'bundle, node arrays': BUNDLE + "forests = [b.forests()[n] for n in b.names]",
+    'lgb node arrays, score': BUNDLE + "import numpy as np\nfrom ml.inference import EnsemblePredictor\n"
+                                       "X = np.zeros((1, len(b.features)), dtype=np.float32)\n"
+                                       "EnsemblePredictor.load(d, ['lgb']).predict(X, engine='numpy')",
+}
+HEAVY = ('pandas', 'scipy', 'sklearn', 'xgboost', 'lightgbm')
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from pathlib import Path
+d = Path({path!r})
+{body}
+elapsed = time.perf_counter() - start
+import sys
+print(','.join(m for m in {heavy!r} if m in sys.modules) or '-')
+print(elapsed)
+"""
+
+
+def cold_load(path: Path, body: str, repeat: int):
+    """Best wall time of `body` over fresh interpreters, and the heavy modules it imported"""
+    times = []
+    for _ in range(repeat):
+        script = SCRIPT.format(path=str(path), body=body, heavy=HEAVY)
+        out = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True,
+                             cwd=ROOT)
+        imported, elapsed = out.stdout.strip().splitlines()[-2:]
+        times.append(float(elapsed))
+    return min(times), imported
+
+
+def dir_bytes(path: Path, pattern: str) -> int:
+    return sum(p.stat().st_size for p in path.glob(pattern) if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bundle = ModelBundle(OUT_DIR)
+    models = bundle.models()
+    with tempfile.TemporaryDirectory() as tmp:
+        pickles = Path(tmp)
+        # The old layout, written from the same models for a like-for-like comparison
+        dump(bundle.scaler, pickles / 'scaler.joblib')
+        for name in MODEL_NAMES:
+            dump(models[name], pickles / f'{name}.joblib')
+
+        print(f"pickles: {dir_bytes(pickles, '*.joblib') / 1e6:.2f} MB, bundle model files: "
+              f"{sum(e['bytes'] for e in bundle.manifest['models'].values()) / 1e6:.2f} MB "
+              f"+ node arrays {dir_bytes(OUT_DIR, '*.nodes/*.npy') / 1e6:.2f} MB")
+        print(f"{'load':>22} {'cold (ms)':>10}  imported")
+        for label, body in LOADERS.items():
+            path = pickles if label.startswith('pickles') else OUT_DIR
+            elapsed, imported = cold_load(path, body, args.repeat)
+            print(f"{label:>22} {elapsed * 1000:>10.1f}  {imported}")
+
+
+if __name__ == '__main__':
+    main()
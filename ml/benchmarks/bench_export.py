@@ -0,0 +1,121 @@
+"""
+Benchmark: legacy df.iterrows() export loop vs vectorized build_player_stats
+
+Run with: python -m ml.benchmarks.bench_export [--sizes 1000 100000 1000000]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from ml.export import build_player_stats
+
+
+def make_players(n: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic player table with the columns the export reads"""
+    rng = np.random.RandomState(seed)
+    depth = rng.choice([1.0, 2.0, 3.0, np.nan], n)
+    return pd.DataFrame({
+        'name': [f'Player {i}' for i in range(n)],
+        'position': rng.choice(['QB', 'RB', 'WR', 'TE', 'K', 'DEF'], n),
+        'team': rng.choice(['ARI', 'BUF', 'KC', 'SF', 'PHI', 'DAL'], n),
+        'age': rng.randint(21, 38, n).astype(float),
+        'years_exp': rng.randint(0, 15, n).astype(float),
+        'depth_chart_order': depth,
+        'injury_status': rng.choice([np.nan, 'Questionable', 'Out', 'IR'], n),
+    })
+
+
+def legacy_export(df: pd.DataFrame, ensemble_pred: np.ndarray) -> list:
+    """The original per-row loop from train.py, kept for comparison"""
+    np.random.seed(42)
+    output_players = []
+    for idx, row in df.iterrows():
+        if idx < len(ensemble_pred):
+            injury_status = row.get('injury_status', 'Healthy')
+            injury_display = injury_status[:10] or 'Healthy' if isinstance(injury_status, str) else 'Healthy'
+            depth_order = row.get('depth_chart_order', 2)
+            if pd.isna(depth_order):
+                depth_order = 2
+            base_proj = float(ensemble_pred[idx] * 0.8)
+            age = int(row.get('age', 25)) if not pd.isna(row.get('age', 25)) else 25
+            years_exp = int(row.get('years_exp', 0)) if not pd.isna(row.get('years_exp', 0)) else 0
+            normalized_score = (ensemble_pred[idx] - ensemble_pred.min()) / (ensemble_pred.max() - ensemble_pred.min())
+            adp = round(300 - (normalized_score * 280), 1)
+            consistency = min(10, max(1,
+                (years_exp * 1.5) +
+                (8 if 25 <= age <= 29 else 6 if age < 25 else max(2, 8 - (age - 29)))
+            ))
+            variance = 11 - consistency
+            ceiling = base_proj + (variance * 2.5)
+            floor = max(0, base_proj - (variance * 2))
+            if row.get('position') in ['RB', 'QB']:
+                carries = round(max(0, 20 - (depth_order * 8) + np.random.normal(0, 3)), 1)
+                targets = round(max(0, 3 + np.random.normal(0, 2)), 1)
+            elif row.get('position') in ['WR', 'TE']:
+                carries = 0.0
+                targets = round(max(0, 8 - (depth_order * 2) + np.random.normal(0, 2)), 1)
+            else:
+                carries = 0.0
+                targets = 0.0
+            if row.get('position') in ['RB', 'TE']:
+                redzone_touches = round(max(0, 3 - depth_order + np.random.normal(0, 0.5)), 1)
+            elif row.get('position') == 'WR':
+                redzone_touches = round(max(0, 2.5 - depth_order + np.random.normal(0, 0.5)), 1)
+            else:
+                redzone_touches = round(max(0, 1 + np.random.normal(0, 0.3)), 1)
+            sos = round(0.7 + (np.random.random() * 0.6), 2)
+            bye_week = int(4 + (np.random.random() * 11))
+            last_season = max(0, round(base_proj * 17 + np.random.normal(0, 30), 1))
+            output_players.append({
+                'id': idx + 1,
+                'name': row.get('name', 'Unknown Player'),
+                'pos': row.get('position', 'UNK'),
+                'team': row.get('team', 'FA'),
+                'score': round(float(ensemble_pred[idx]), 1),
+                'proj': round(base_proj, 1),
+                'snap': max(1, min(100, int((3 - depth_order) * 30 + 40))),
+                'injury': injury_display,
+                'tier': min(5, max(1, int((100 - ensemble_pred[idx]) // 15) + 1)),
+                'adp': adp,
+                'targets': targets,
+                'carries': carries,
+                'redzone_touches': redzone_touches,
+                'strength_of_schedule': sos,
+                'bye_week': bye_week,
+                'age': age,
+                'experience': years_exp,
+                'last_season_points': last_season,
+                'consistency_rating': round(consistency, 1),
+                'ceiling_projection': round(ceiling, 1),
+                'floor_projection': round(floor, 1)
+            })
+    return output_players
+
+
+def time_call(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=100_000,
+                        help='skip the legacy loop above this size (it is quadratic in rows)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in args.sizes:
+        df = make_players(n)
+        preds = np.random.RandomState(1).uniform(20, 100, n)
+        new_s = time_call(build_player_stats, df, preds)
+        if n <= args.legacy_max_rows:
+            old_s = time_call(legacy_export, df, preds)
+            print(f"{n:>10,} {old_s:>12.3f} {new_s:>15.3f} {old_s / new_s:>8.0f}x")
+        else:
+            print(f"{n:>10,} {'skipped':>12} {new_s:>15.3f} {'-':>9}")
+
+
+if __name__ == '__main__':
+    main()
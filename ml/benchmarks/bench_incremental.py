@@ -0,0 +1,74 @@
+"""
+Regression check: incremental retrain vs a full retrain after a small change
+Flips the depth-chart slot of a few players, continues the fitted ensemble on them with
+continue_models (as python ml/train.py --incremental does) and compares every player's score
+with a from-scratch fit on the same data. Exits 1 when the incremental scores drift further
+than --max-mean-diff points on average or move more than --max-moved of the players by over
+a point. Nothing is written to ml_output
+
+Run with: python -m ml.benchmarks.bench_incremental [--changes 20 50 100 200]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from ml.train import INCREMENTAL_MIN_ROWS, MODEL_NAMES, continue_models, featurize, load_data, make_model
+
+
+def fit_all(X, y) -> dict:
+    return {name: make_model(name).fit(X, y) for name in MODEL_NAMES}
+
+
+def ensemble(models: dict, X) -> np.ndarray:
+    return np.mean([models[name].predict(X) for name in MODEL_NAMES], axis=0)
+
+
+def change_players(df, n: int, seed: int = 0):
+    """Copy of df with n players moved between starter and backup; returns (df, changed mask)"""
+    idx = np.random.RandomState(seed).choice(len(df), n, replace=False)
+    changed = df.copy()
+    col = changed.columns.get_loc('depth_chart_order')
+    flipped = np.where(changed['depth_chart_order'].iloc[idx] == 1, 2.0, 1.0)
+    changed.iloc[idx, col] = flipped.astype(changed['depth_chart_order'].dtype)
+    mask = np.zeros(len(df), dtype=bool)
+    mask[idx] = True
+    return changed, mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental vs full retrain after a small change')
+    parser.add_argument('--changes', type=int, nargs='+', default=[INCREMENTAL_MIN_ROWS, 50, 100, 200])
+    parser.add_argument('--max-mean-diff', type=float, default=0.5)
+    parser.add_argument('--max-moved', type=float, default=0.1,
+                        help='largest share of players allowed to move by more than one point')
+    args = parser.parse_args()
+
+    df = load_data()
+    X, y = featurize(df)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    failed = False
+    print(f"{'changed':>8} {'mean diff':>10} {'max diff':>9} {'moved >1':>9} {'update s':>9} {'full s':>7}")
+    for n in args.changes:
+        base = fit_all(X, y)
+        changed, new_rows = change_players(df, n)
+        X_new, y_new = featurize(changed)
+        X_new = np.ascontiguousarray(X_new, dtype=np.float32)
+
+        start = time.perf_counter()
+        updated = continue_models(base, None, X_new, y_new, new_rows)
+        update_s = time.perf_counter() - start
+        start = time.perf_counter()
+        full = fit_all(X_new, y_new)
+        full_s = time.perf_counter() - start
+
+        diff = np.abs(ensemble(updated, X_new) - ensemble(full, X_new))
+        moved = float(np.mean(diff > 1))
+        ok = diff.mean() <= args.max_mean_diff and moved <= args.max_moved
+        failed |= not ok
+        print(f"{n:8d} {diff.mean():10.2f} {diff.max():9.2f} {moved:8.1%} {update_s:9.2f} {full_s:7.2f}"
+              f"  {'✅' if ok else '❌'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: reload-and-predict per call vs the preloaded EnsemblePredictor (native and NumPy engines)
+Needs trained models in ml_output (python ml/train.py)
+
+Run with: python -m ml.benchmarks.bench_inference [--rows 10000 100000 300000]
+"""
+import argparse
+import time
+import numpy as np
+from ml.artifacts import ModelBundle
+from ml.inference import EnsemblePredictor
+from ml.train import FEATURE_INPUT_COLUMNS, MODEL_NAMES, OUT_DIR, build_features, load_data
+
+
+def make_rows(n: int, seed: int = 0) -> np.ndarray:
+    """What-if batch: real player feature rows resampled to n rows (so mostly repeats)"""
+    X = build_features(load_data(FEATURE_INPUT_COLUMNS)).to_numpy()
+    rng = np.random.RandomState(seed)
+    return X[rng.randint(0, len(X), n)]
+
+
+def legacy_predict(X) -> np.ndarray:
+    """The previous end of train.py: load scaler and models per call, predict each, stack and average"""
+    bundle = ModelBundle(OUT_DIR)
+    bundle.scaler
+    models = bundle.models()
+    return np.mean([models[name].predict(X) for name in MODEL_NAMES], axis=0)
+
+
+def best_of(fn, arg, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 300_000])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    predictor = EnsemblePredictor.load()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    forests = predictor.compiled
+    compile_s = time.perf_counter() - start
+    print(f"Load once: {load_s:.3f}s, compile to node arrays: {compile_s:.3f}s "
+          f"({sum(f.nbytes for f in forests.values()) / 1e6:.1f} MB)")
+
+    print(f"{'rows':>9} {'reload+predict (s)':>19} {'native (s)':>11} {'numpy (s)':>10} "
+          f"{'native+dedupe (s)':>18} {'speedup':>8}")
+    for n in args.rows:
+        X = make_rows(n)
+        old_s = best_of(legacy_predict, X)
+        native_s = best_of(predictor.predict, X)
+        numpy_s = best_of(lambda batch: predictor.predict(batch, engine='numpy'), X)
+        dedupe_s = best_of(lambda batch: predictor.predict(batch, dedupe=True), X)
+        print(f"{n:>9,} {old_s:>19.3f} {native_s:>11.3f} {numpy_s:>10.3f} {dedupe_s:>18.3f} "
+              f"{old_s / dedupe_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
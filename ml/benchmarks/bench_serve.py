@@ -0,0 +1,78 @@
+"""
+Benchmark: scoring service latency under concurrent single-player re-scores
+Compares no batching on the library predictors against micro-batching with the auto engine.
+Needs trained models in ml_output (python ml/train.py)
+
+Run with: python -m ml.benchmarks.bench_serve [--clients 16 --requests 50]
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ml.serve import make_server
+
+CONFIGS = [
+    ('no batching, native', dict(max_batch=1, engine='native')),
+    ('no batching, auto', dict(max_batch=1, engine='auto')),
+    ('micro-batch, native', dict(max_batch=512, engine='native')),
+    ('micro-batch, auto', dict(max_batch=512, engine='auto')),
+]
+
+
+def client(port: int, player_ids, n_requests: int, seed: int):
+    """One keep-alive connection sending depth-chart what-ifs; returns per-request seconds"""
+    rng = np.random.RandomState(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    latencies = []
+    for _ in range(n_requests):
+        body = json.dumps({'player_id': player_ids[rng.randint(len(player_ids))],
+                           'depth_chart_order': int(rng.randint(1, 4))})
+        start = time.perf_counter()
+        conn.request('POST', '/score', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        assert response.status == 200, response.status
+    conn.close()
+    return latencies
+
+
+def run(config, clients: int, n_requests: int):
+    server = make_server(port=0, **config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    player_ids = list(server.service.players.index)
+    try:
+        client(port, player_ids, 5, seed=0)  # warm-up
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            results = list(pool.map(lambda i: client(port, player_ids, n_requests, seed=i + 1), range(clients)))
+        elapsed = time.perf_counter() - start
+        report = server.service.report()
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.service.batcher.close()
+    latencies = np.concatenate(results) * 1000
+    return elapsed, latencies, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50, help='requests per client')
+    args = parser.parse_args()
+
+    print(f"{'config':>20} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'rows/batch':>11}")
+    for label, config in CONFIGS:
+        elapsed, latencies, report = run(config, args.clients, args.requests)
+        print(f"{label:>20} {len(latencies) / elapsed:>8.0f} {np.percentile(latencies, 50):>9.1f} "
+              f"{np.percentile(latencies, 99):>9.1f} {report['mean_batch_rows']:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Cross-source player identity resolution (Sleeper, ESPN, NFL.com, Yahoo)
+Records are matched with hash joins on normalized blocking keys, strictest first,
+instead of pairwise comparisons; the crosswalk is persisted so later runs only
+have to resolve ids they have not seen before
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+from ml.storage import STORE_DIR
+
+CROSSWALK_FILE = 'crosswalk.parquet'
+CROSSWALK_COLUMNS = ['uid', 'source', 'source_id', 'name_key', 'team', 'position', 'jersey']
+
+# The first source to claim a player names it (uid = its id) and wins field conflicts
+SOURCE_PRIORITY = ('sleeper', 'espn', 'nfl', 'yahoo')
+
+# Fields another source covers better than the default order
+FIELD_PRIORITY = {'injury_status': ('espn', 'sleeper', 'nfl', 'yahoo')}
+
+# Blocking passes, strictest first; a pass only joins keys that are unique on both sides
+BLOCKING_KEYS = (
+    ('name_key', 'team', 'position', 'jersey'),
+    ('name_key', 'team', 'position'),
+    ('name_key', 'position'),
+)
+
+TEAM_ALIASES = {'JAC': 'JAX', 'WSH': 'WAS', 'LA': 'LAR', 'OAK': 'LV', 'SD': 'LAC', 'STL': 'LAR'}
+POSITION_ALIASES = {'D/ST': 'DEF', 'DST': 'DEF', 'PK': 'K'}
+_NAME_SUFFIXES = r'\b(?:jr|sr|ii|iii|iv|v)\b'
+
+
+def _per_unique(s: pd.Series, fn) -> pd.Series:
+    """Apply a vectorized string transform to the distinct values only, then broadcast"""
+    codes, uniques = pd.factorize(s.astype('string'), use_na_sentinel=True)
+    mapped = fn(pd.Series(uniques, dtype='string')).to_numpy(dtype=object)
+    out = np.full(len(s), pd.NA, dtype=object)
+    out[codes >= 0] = mapped[codes[codes >= 0]]
+    return pd.Series(out, index=s.index, dtype='string')
+
+
+def normalize_names(s: pd.Series) -> pd.Series:
+    """'Amon-Ra St. Brown Jr.' -> 'amonra st brown'"""
+    def norm(v: pd.Series) -> pd.Series:
+        v = v.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii').str.lower()
+        v = v.str.replace(r"[.'`\-]", '', regex=True).str.replace(_NAME_SUFFIXES, '', regex=True)
+        return v.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return _per_unique(s, norm)
+
+
+def identity_keys(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Blocking keys of one source's records, one row per source id"""
+    team = _per_unique(df['team'], lambda v: v.str.upper().replace(TEAM_ALIASES)).fillna('FA')
+    position = _per_unique(df['position'], lambda v: v.str.upper().replace(POSITION_ALIASES))
+    name_key = normalize_names(df['name'])
+    # Team defenses are named differently everywhere ('Bills D/ST', 'Buffalo Bills'); the team is the identity
+    name_key = name_key.mask(position == 'DEF', 'def ' + team)
+    jersey = df['jersey_number'] if 'jersey_number' in df.columns else pd.Series(pd.NA, index=df.index)
+    keys = pd.DataFrame({
+        'source': source,
+        'source_id': df['player_id'].astype('string'),
+        'name_key': name_key.replace('', pd.NA),
+        'team': team,
+        'position': position,
+        'jersey': pd.to_numeric(jersey, errors='coerce').astype('Int16'),
+    })
+    return keys.dropna(subset=['source_id']).drop_duplicates('source_id')
+
+
+def _empty_crosswalk() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype='Int16' if c == 'jersey' else 'string') for c in CROSSWALK_COLUMNS})
+
+
+def load_crosswalk(store_dir: Path = STORE_DIR) -> pd.DataFrame:
+    path = store_dir / CROSSWALK_FILE
+    return pd.read_parquet(path) if path.exists() else _empty_crosswalk()
+
+
+def save_crosswalk(crosswalk: pd.DataFrame, store_dir: Path = STORE_DIR) -> Path:
+    """Write the crosswalk atomically next to the partitions"""
+    path = store_dir / CROSSWALK_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    crosswalk.to_parquet(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def _block_match(pending: pd.DataFrame, anchors: pd.DataFrame) -> pd.DataFrame:
+    """(source_id, uid) pairs linked by the blocking passes, one-to-one"""
+    matches = []
+    for block in BLOCKING_KEYS:
+        if pending.empty or anchors.empty:
+            break
+        cols = list(block)
+        left = pending.dropna(subset=cols).drop_duplicates(cols, keep=False)
+        right = anchors.dropna(subset=cols)[cols + ['uid']].drop_duplicates()
+        right = right.drop_duplicates(cols, keep=False)
+        hits = left[cols + ['source_id']].merge(right, on=cols, how='inner')
+        hits = hits.drop_duplicates('uid', keep=False)[['source_id', 'uid']]
+        if len(hits):
+            matches.append(hits)
+            pending = pending[~pending['source_id'].isin(hits['source_id'])]
+            anchors = anchors[~anchors['uid'].isin(hits['uid'])]
+    if not matches:
+        return pd.DataFrame({'source_id': pd.Series(dtype='string'), 'uid': pd.Series(dtype='string')})
+    return pd.concat(matches, ignore_index=True)
+
+
+def resolve(frames: Dict[str, pd.DataFrame], crosswalk: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Extend the crosswalk with this pull's records, source by source in priority order
+    Known (source, id) pairs keep their uid via one join; only new ids go through blocking
+    """
+    crosswalk = _empty_crosswalk() if crosswalk is None else crosswalk
+    ordered = sorted(frames, key=lambda s: SOURCE_PRIORITY.index(s) if s in SOURCE_PRIORITY else len(SOURCE_PRIORITY))
+    for source in ordered:
+        keys = identity_keys(frames[source], source)
+        mine = crosswalk['source'] == source
+        known = crosswalk.loc[mine, ['source_id', 'uid']]
+        keys = keys.merge(known, on='source_id', how='left')
+
+        # New ids may only link to players this source has no id for yet
+        pending = keys[keys['uid'].isna()].drop(columns='uid')
+        anchors = crosswalk[~mine & ~crosswalk['uid'].isin(known['uid'])]
+        matched = _block_match(pending, anchors).set_index('source_id')['uid']
+        keys['uid'] = keys['uid'].fillna(keys['source_id'].map(matched)).fillna(keys['source_id'])
+
+        # Ids missing from this pull stay so a returning player keeps its uid
+        gone = crosswalk[mine & ~crosswalk['source_id'].isin(keys['source_id'])]
+        crosswalk = pd.concat([crosswalk[~mine], gone, keys[CROSSWALK_COLUMNS]], ignore_index=True)
+    return crosswalk.astype({'jersey': 'Int16'})
+
+
+def merge_players(frames: Dict[str, pd.DataFrame], crosswalk: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per resolved player: each field from the highest-priority source that has it
+    player_id becomes the uid, and every source's own id is kept as <source>_id
+    """
+    parts = []
+    for source, df in frames.items():
+        uids = crosswalk.loc[crosswalk['source'] == source].set_index('source_id')['uid']
+        part = df.assign(source=source, uid=df['player_id'].astype('string').map(uids))
+        parts.append(part[part['uid'].notna()])
+    players = pd.concat(parts, ignore_index=True)
+
+    def first_by(order):
+        rank = players['source'].map({s: i for i, s in enumerate(order)}).fillna(len(order))
+        # groupby().first() skips missing values, so this coalesces fields across sources
+        return players.assign(_rank=rank).sort_values(['uid', '_rank'], kind='stable').groupby('uid', sort=False)
+
+    merged = first_by(SOURCE_PRIORITY).first().drop(columns=['player_id', '_rank'])
+    for col, order in FIELD_PRIORITY.items():
+        if col in merged.columns:
+            merged[col] = first_by(order)[col].first()
+
+    ids = crosswalk[crosswalk['uid'].isin(merged.index)]
+    ids = ids.pivot_table(index='uid', columns='source', values='source_id', aggfunc='first')
+    ids = ids.add_suffix('_id')
+    merged = merged.drop(columns=[c for c in ids.columns if c in merged.columns]).join(ids)
+    return merged.rename_axis('player_id').reset_index()
@@ -0,0 +1,110 @@
+"""
+Delta sync: diff each new player pull against the last stored snapshot
+Changes are kept as a compact long-format changelog (one row per changed field),
+so downstream stages can recompute only the affected players
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+
+from ml.storage import STORE_DIR, latest_partition, read_partition
+
+# Fields whose changes matter downstream (features and export)
+TRACKED_COLUMNS = (
+    'team', 'position', 'injury_status', 'depth_chart_order', 'depth_chart_position',
+    'age', 'years_exp', 'weight', 'name',
+)
+CHANGELOG_COLUMNS = ['player_id', 'op', 'column', 'old', 'new']
+
+
+def _as_text(s: pd.Series) -> pd.Series:
+    """Comparable text form of a column; missing values compare equal to each other"""
+    return s.astype('string').fillna('\x00')
+
+
+def diff_snapshots(old: pd.DataFrame, new: pd.DataFrame, key: str = 'player_id',
+                   columns=TRACKED_COLUMNS) -> pd.DataFrame:
+    """Changelog from old to new: inserts, deletes, and one 'update' row per changed field"""
+    old = old.drop_duplicates(key).set_index(key)
+    new = new.drop_duplicates(key).set_index(key)
+    inserted = new.index.difference(old.index)
+    deleted = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+
+    parts = [
+        pd.DataFrame({'player_id': inserted, 'op': 'insert'}),
+        pd.DataFrame({'player_id': deleted, 'op': 'delete'}),
+    ]
+    for col in columns:
+        if col not in old.columns or col not in new.columns:
+            continue
+        before = _as_text(old.loc[common, col])
+        after = _as_text(new.loc[common, col])
+        changed = (before != after).to_numpy()
+        if changed.any():
+            parts.append(pd.DataFrame({
+                'player_id': common[changed],
+                'op': 'update',
+                'column': col,
+                'old': before[changed].replace('\x00', pd.NA).to_numpy(),
+                'new': after[changed].replace('\x00', pd.NA).to_numpy(),
+            }))
+    changes = pd.concat(parts, ignore_index=True).reindex(columns=CHANGELOG_COLUMNS)
+    return changes.astype({'player_id': 'string', 'op': 'category', 'column': 'string',
+                           'old': 'string', 'new': 'string'})
+
+
+def changelog_dir(source: str, store_dir: Path = STORE_DIR) -> Path:
+    return store_dir.parent / 'changelog' / f'source={source}'
+
+
+def write_changelog(changes: pd.DataFrame, source: str, store_dir: Path = STORE_DIR) -> Optional[Path]:
+    """Append one batch of changes (a timestamped Parquet file); nothing is written for no changes"""
+    if changes.empty:
+        return None
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    path = changelog_dir(source, store_dir) / f'{stamp}.parquet'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    changes.to_parquet(path, index=False)
+    return path
+
+
+def read_changelog(source: str, since: Optional[str] = None, store_dir: Path = STORE_DIR):
+    """(changes, last batch stamp) for batches after `since`, oldest first"""
+    paths = sorted(changelog_dir(source, store_dir).glob('*.parquet'))
+    paths = [p for p in paths if since is None or p.stem > since]
+    if not paths:
+        return pd.DataFrame(columns=CHANGELOG_COLUMNS), since
+    changes = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+    return changes, paths[-1].stem
+
+
+def latest_batch(source: str, store_dir: Path = STORE_DIR) -> Optional[str]:
+    """Stamp of the most recent changelog batch, or None"""
+    paths = sorted(changelog_dir(source, store_dir).glob('*.parquet'))
+    return paths[-1].stem if paths else None
+
+
+def record_changes(df: pd.DataFrame, source: str, store_dir: Path = STORE_DIR) -> pd.DataFrame:
+    """Diff a fresh pull against the source's latest stored snapshot and log the changes"""
+    previous = latest_partition(source, store_dir)
+    if previous is None or 'player_id' not in df.columns:
+        return pd.DataFrame(columns=CHANGELOG_COLUMNS)
+    changes = diff_snapshots(read_partition(previous), df)
+    write_changelog(changes, source, store_dir)
+    return changes
+
+
+def summarize(changes: pd.DataFrame) -> str:
+    """e.g. '2 inserts, 5 updates (injury_status: 4, team: 1), 0 deletes'"""
+    ops = changes['op'].value_counts()
+    updates = changes.loc[changes['op'] == 'update', 'column'].value_counts()
+    detail = ', '.join(f"{col}: {n}" for col, n in updates.items())
+    return (f"{ops.get('insert', 0)} inserts, {ops.get('update', 0)} updates"
+            f"{f' ({detail})' if detail else ''}, {ops.get('delete', 0)} deletes")
+
+
+def affected_players(changes: pd.DataFrame) -> set:
+    """Player ids touched by a changelog; presence in the current snapshot decides rescore vs drop"""
+    return set(changes['player_id'])
@@ -0,0 +1,175 @@
+"""
+Vectorized export of ensemble predictions to the web app player format
+"""
+import numpy as np
+import pandas as pd
+
+# Output keys in the order the web app (app.js / data.json) expects them
+EXPORT_COLUMNS = [
+    'id', 'name', 'pos', 'team', 'score', 'proj', 'snap', 'injury', 'tier',
+    'adp', 'targets', 'carries', 'redzone_touches', 'strength_of_schedule',
+    'bye_week', 'age', 'experience', 'last_season_points', 'consistency_rating',
+    'ceiling_projection', 'floor_projection',
+]
+
+# Player table columns read by build_player_stats
+EXPORT_INPUT_COLUMNS = ['name', 'position', 'team', 'injury_status', 'depth_chart_order', 'age', 'years_exp']
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """Return df[name] with missing values filled, or a constant column if absent"""
+    if name not in df.columns:
+        return pd.Series(default, index=df.index)
+    col = df[name]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(object)
+    return col.fillna(default)
+
+
+def _numeric(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    """Numeric column as float64 array with NaN/unparseable values set to default"""
+    if name not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return np.where(np.isnan(values), default, values)
+
+
+def _injury_display(df: pd.DataFrame) -> np.ndarray:
+    """First 10 chars of injury_status, 'Healthy' for blanks and non-strings"""
+    if 'injury_status' not in df.columns:
+        return np.full(len(df), 'Healthy', dtype=object)
+    # Map the handful of distinct statuses once instead of once per player
+    codes, uniques = pd.factorize(df['injury_status'].astype(object), use_na_sentinel=False)
+    labels = np.array([v[:10] if isinstance(v, str) and v else 'Healthy' for v in uniques], dtype=object)
+    return labels[codes]
+
+
+def build_player_stats(df: pd.DataFrame, preds, seed: int = 42) -> pd.DataFrame:
+    """
+    Build every exported column for all players in one pass
+    Random draws are made in fixed-size batches from a seeded RandomState so the
+    output only depends on the seed and the row order, not on per-row branching
+    """
+    preds = np.asarray(preds, dtype=float)
+    n = len(preds)
+    df = df.iloc[:n]
+    rng = np.random.RandomState(seed)
+
+    position = _column(df, 'position', 'UNK').astype(str).to_numpy()
+    depth_order = _numeric(df, 'depth_chart_order', 2)
+    age = np.trunc(_numeric(df, 'age', 25)).astype(int)
+    years_exp = np.trunc(_numeric(df, 'years_exp', 0)).astype(int)
+
+    base_proj = preds * 0.8
+
+    # ADP from score rank range (higher score = lower/better ADP), ~20 to 300
+    span = preds.max() - preds.min() if n else 0.0
+    normalized_score = (preds - preds.min()) / span if span else np.zeros(n)
+    adp = np.round(300 - normalized_score * 280, 1)
+
+    # Consistency rating (1-10) from age and experience
+    age_bonus = np.where((age >= 25) & (age <= 29), 8,
+                np.where(age < 25, 6, np.maximum(2, 8 - (age - 29))))
+    consistency = np.clip(years_exp * 1.5 + age_bonus, 1, 10)
+
+    # Ceiling and floor (higher consistency = lower variance)
+    variance = 11 - consistency
+    ceiling = base_proj + variance * 2.5
+    floor = np.maximum(0, base_proj - variance * 2)
+
+    # Batched noise draws, one vector per stat
+    carry_noise = rng.normal(0, 3, n)
+    target_noise = rng.normal(0, 2, n)
+    redzone_noise = rng.normal(0, 1, n)
+    sos_draw = rng.random_sample(n)
+    bye_draw = rng.random_sample(n)
+    season_noise = rng.normal(0, 30, n)
+
+    is_rb_qb = np.isin(position, ['RB', 'QB'])
+    is_wr_te = np.isin(position, ['WR', 'TE'])
+    carries = np.where(is_rb_qb, np.maximum(0, 20 - depth_order * 8 + carry_noise), 0.0)
+    targets = np.where(is_rb_qb, np.maximum(0, 3 + target_noise),
+              np.where(is_wr_te, np.maximum(0, 8 - depth_order * 2 + target_noise), 0.0))
+
+    # Red zone opportunities (based on position and depth)
+    redzone = np.where(np.isin(position, ['RB', 'TE']), 3 - depth_order + redzone_noise * 0.5,
+              np.where(position == 'WR', 2.5 - depth_order + redzone_noise * 0.5,
+                       1 + redzone_noise * 0.3))
+
+    last_season = np.maximum(0, np.round(base_proj * 17 + season_noise, 1))  # 17 games
+
+    return pd.DataFrame({
+        'id': df.index.to_numpy() + 1,
+        'name': _column(df, 'name', 'Unknown Player').to_numpy(),
+        'pos': position,
+        'team': _column(df, 'team', 'FA').to_numpy(),
+        'score': np.round(preds, 1),
+        'proj': np.round(base_proj, 1),
+        'snap': np.clip(np.trunc((3 - depth_order) * 30 + 40), 1, 100).astype(int),
+        'injury': _injury_display(df),
+        'tier': np.clip((100 - preds) // 15 + 1, 1, 5).astype(int),
+        'adp': adp,
+        'targets': np.round(targets, 1),
+        'carries': np.round(carries, 1),
+        'redzone_touches': np.round(np.maximum(0, redzone), 1),
+        'strength_of_schedule': np.round(0.7 + sos_draw * 0.6, 2),
+        'bye_week': (4 + bye_draw * 11).astype(int),
+        'age': age,
+        'experience': years_exp,
+        'last_season_points': last_season,
+        'consistency_rating': np.round(consistency, 1),
+        'ceiling_projection': np.round(ceiling, 1),
+        'floor_projection': np.round(floor, 1),
+    }, columns=EXPORT_COLUMNS)
+
+
+def select_top_k(scores, k: int, tie_break=(), groups=None, quotas=None) -> np.ndarray:
+    """
+    Row indices of the k highest scores, best first, without a full sort
+    tie_break: integer key arrays (ascending) ordering equal scores, row order last
+    quotas: optional {group: max rows} caps, with groups giving each row's group
+    """
+    scores = np.asarray(scores, dtype=float)
+    keys = [np.asarray(key) for key in tie_break]
+
+    def best(idx: np.ndarray, n: int) -> np.ndarray:
+        if n <= 0:
+            return idx[:0]
+        if n < len(idx):
+            # Partial selection: keep everything tied with the n-th best score
+            s = scores[idx]
+            threshold = np.partition(s, len(s) - n)[len(s) - n]
+            idx = idx[s >= threshold]
+        order = np.lexsort([idx] + [key[idx] for key in reversed(keys)] + [-scores[idx]])
+        return idx[order][:n]
+
+    candidates = np.arange(len(scores))
+    if quotas:
+        groups = np.asarray(groups)
+        parts = [candidates[~np.isin(groups, list(quotas))]]
+        for group, cap in quotas.items():
+            parts.append(best(candidates[groups == group], cap))
+        candidates = np.concatenate(parts)
+    return best(candidates, k)
+
+
+def export_top_players(df: pd.DataFrame, preds, k: int = 300, tie_break=('index',),
+                       quotas=None, seed: int = 42) -> list:
+    """
+    Export dicts for the top k players by score
+    tie_break: export column names ordering equal scores ('-col' for descending,
+    'index' for original row order); quotas: optional {position: max players}
+    """
+    stats = build_player_stats(df, preds, seed=seed)
+    keys = []
+    for name in tie_break:
+        column = name.lstrip('-')
+        if column == 'index':
+            key = np.arange(len(stats))
+        else:
+            key = pd.factorize(stats[column], sort=True)[0]
+        keys.append(-key if name.startswith('-') else key)
+    top = select_top_k(stats['score'].to_numpy(), k, tie_break=keys,
+                       groups=stats['pos'].to_numpy(), quotas=quotas)
+    # Only the survivors are turned into Python dicts
+    return stats.iloc[top].to_dict('records')
@@ -0,0 +1,70 @@
+"""
+Feature store: featurized matrices cached on disk, keyed by input content hash
+A cache entry is reused only if the input file bytes, the featurize code and the schema
+version (ml.schema.schema_version) all match. Only the current entry is kept: writing a new
+one removes the others
+"""
+import hashlib
+import inspect
+import json
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+def feature_key(source: Path, *funcs, version: str = '') -> str:
+    """Hash of the input file contents, the source code of the featurize functions and version"""
+    h = hashlib.sha256(version.encode('utf-8'))
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    for fn in funcs:
+        h.update(inspect.getsource(fn).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def load_features(cache_dir: Path, key: str):
+    """Memory-map a cached (X, y), or return None on a cache miss"""
+    entry = cache_dir / key
+    meta_path = entry / 'meta.json'
+    if not meta_path.exists():
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    X = np.load(entry / 'X.npy', mmap_mode='r')
+    y = np.load(entry / 'y.npy', mmap_mode='r')
+    return pd.DataFrame(X, columns=meta['columns'], copy=False), y
+
+
+def save_features(cache_dir: Path, key: str, X: pd.DataFrame, y, **meta):
+    """Write X as float32 and y as float64; meta.json is written last and marks the entry complete"""
+    entry = cache_dir / key
+    entry.mkdir(parents=True, exist_ok=True)
+    np.save(entry / 'X.npy', np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+    np.save(entry / 'y.npy', np.asarray(y, dtype=np.float64))
+    meta = {'columns': list(X.columns), 'rows': len(X), **meta}
+    with open(entry / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def prune_features(cache_dir: Path, keep: str):
+    """Remove every cache entry except `keep`"""
+    for entry in cache_dir.iterdir():
+        if entry.is_dir() and entry.name != keep:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def cached_features(source: Path, load_fn, featurize_fn, cache_dir: Path, version_funcs=(), version: str = ''):
+    """
+    (X, y) for source, from cache when the input, featurize code and version are unchanged
+    Returns (X, y, hit); X is always a float32 frame so hits and misses train identically
+    """
+    key = feature_key(source, featurize_fn, *version_funcs, version=version)
+    cached = load_features(cache_dir, key)
+    if cached is not None:
+        return (*cached, True)
+    X, y = featurize_fn(load_fn())
+    save_features(cache_dir, key, X, y, source=str(source), version=version)
+    prune_features(cache_dir, key)
+    return (*load_features(cache_dir, key), False)
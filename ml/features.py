@@ -0,0 +1,135 @@
+"""
+Player inputs and model features, without the model libraries
+Paths, load_data and build_features live here so that scoring code (ml.serve) can import
+them without pulling in sklearn, XGBoost and LightGBM through ml.train; ml.train re-exports
+all of them. The ensemble member names and OUT_DIR come from ml.artifacts, which the
+node-array scoring path imports without pandas
+"""
+import json
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.artifacts import MODEL_NAMES, NEEDS_SCALING, OUT_DIR
+from ml.schema import read_players
+from ml.storage import latest_partition, read_partition
+from ml.telemetry import span
+
+DATA_IN = ROOT / 'data' / 'nfl_players_sleeper.csv'
+STORE_SOURCES = ('merged', 'sleeper')
+
+# Player columns read by build_features/featurize
+FEATURE_INPUT_COLUMNS = ['position', 'age', 'years_exp', 'weight', 'depth_chart_order']
+
+OUT_DIR.mkdir(exist_ok=True)
+
+
+def store_source() -> str:
+    """Store source the pipeline reads: the cross-source merge when present, else Sleeper"""
+    for source in STORE_SOURCES:
+        if latest_partition(source) is not None:
+            return source
+    return STORE_SOURCES[-1]
+
+
+def data_source():
+    """Latest merged/Sleeper partition in the columnar store, else the CSV export, else None"""
+    partition = latest_partition(store_source())
+    if partition is not None:
+        return partition
+    return DATA_IN if DATA_IN.exists() else None
+
+
+def load_data(columns=None):
+    """Load real NFL player data from Sleeper API, optionally only some columns"""
+    source = data_source()
+    if source is not None:
+        with span('parse', source=source.name) as parse:
+            if source.suffix == '.parquet':
+                df = read_partition(source, columns)
+            else:
+                df = read_players(source, columns)
+            parse.rows = len(df)
+        print(f"Loaded {len(df)} players from {source}")
+        return df
+    else:
+        # Fallback to sample data if sleeper data not available
+        with open(ROOT / 'data.json','r',encoding='utf-8') as f:
+            data = json.load(f)
+        print("Using fallback sample data")
+        return pd.DataFrame(data)
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Model feature matrix for a schema-typed player table (no target)"""
+    # Handle missing values first
+    age = df['age'].astype('float32').fillna(25)
+    years_exp = df['years_exp'].astype('float32').fillna(0)
+    weight = df['weight'].astype('float32').fillna(200)
+    depth_chart_order = df['depth_chart_order'].astype('float32').fillna(2)
+    position = df['position']
+    
+    X = pd.DataFrame({
+        'age': age,
+        'years_exp': years_exp,
+        'weight_norm': weight / 250,  # Normalize weight
+        'depth_chart_order': depth_chart_order,
+        'age_exp_ratio': age / (years_exp + 1),  # Age efficiency
+        # Position encoding (one-hot)
+        'pos_rb': position == 'RB',
+        'pos_wr': position == 'WR',
+        'pos_qb': position == 'QB',
+        'pos_te': position == 'TE',
+        'pos_k': position == 'K',
+        'pos_def': position == 'DEF',
+        # Experience-based features
+        'is_rookie': years_exp == 0,
+        'is_veteran': years_exp >= 5,
+        'prime_age': (age >= 24) & (age <= 29),
+        # Depth chart features (starter vs backup)
+        'is_starter': depth_chart_order == 1,
+        'is_backup': depth_chart_order == 2,
+    }, index=df.index)
+    
+    return X.astype('float32').fillna(0)
+
+
+def featurize(df: pd.DataFrame) -> pd.DataFrame:
+    """Create features from real NFL player data"""
+    X = build_features(df)
+    
+    # Create synthetic target based on multiple factors
+    # This is a placeholder - in real scenario you'd use historical fantasy points
+    base_score = 50
+    
+    # Position scoring adjustments
+    pos_multipliers = {'QB': 1.2, 'RB': 1.1, 'WR': 1.0, 'TE': 0.9, 'K': 0.6, 'DEF': 0.7}
+    pos_scores = df['position'].map(pos_multipliers).astype('float64').fillna(0.5) * 40
+    
+    # Experience bonus (peaks around 3-7 years)
+    years_exp = X['years_exp']
+    exp_bonus = np.where(years_exp < 3, years_exp * 5,
+                np.where(years_exp <= 7, 15 + (years_exp - 3) * 2,
+                        23 - (years_exp - 7) * 1))
+    
+    # Age penalty (decline after 30)
+    age_penalty = np.where(X['age'] <= 30, 0, (X['age'] - 30) * -2)
+    
+    # Depth chart bonus (starters get big boost)
+    depth_bonus = np.where(X['depth_chart_order'] == 1, 20,
+                  np.where(X['depth_chart_order'] == 2, 5, 0))
+    
+    # Add some controlled randomness for variation
+    np.random.seed(42)
+    random_factor = np.random.normal(0, 5, len(X))
+    
+    y = base_score + pos_scores + exp_bonus + age_penalty + depth_bonus + random_factor
+    y = np.clip(y, 0, 100)  # Keep scores between 0-100
+    
+    return X, y
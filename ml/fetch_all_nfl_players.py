@@ -1,66 +1,102 @@
 """
 Master script to fetch all active NFL players from multiple sources
-Priority: Sleeper API > ESPN API > NFL.com > Yahoo Fantasy
+Sources are merged through an ID crosswalk; on conflicts Sleeper API > ESPN API > NFL.com > Yahoo Fantasy
+(ESPN wins injury status)
 """
-import requests
+import os
+import sys
 import pandas as pd
 from typing import List, Dict, Optional
-import json
 from pathlib import Path
 
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def fetch_all_nfl_players(season: int = 2024, output_dir: str = "data") -> pd.DataFrame:
+from ml.crosswalk import load_crosswalk, merge_players, resolve, save_crosswalk
+from ml.delta import record_changes, summarize
+from ml.fetch_engine import ROSTER_PER_HOST, FetchEngine, get_engine
+from ml.fetch_espn_players import get_espn_player_universe, split_by_position
+from ml.json_stream import ColumnBuilder, iter_object_items
+from ml.schema import apply_schema
+from ml.storage import write_partition
+from ml.telemetry import span, traced, write_report
+
+REPORT_PATH = Path(__file__).resolve().parents[1] / 'ml_output' / 'fetch_report.json'
+
+
+def fetch_all_nfl_players(season: int = 2024, output_dir: str = "data", week: int = 0) -> pd.DataFrame:
     """
-    Fetch all NFL players using the best available source
+    Fetch all NFL players from every available source, merged per player
     Returns a comprehensive DataFrame with all active players
+    The cleaned table is stored as a columnar partition; CSV/JSON are exports
     """
     
     print(f"🏈 Fetching all active NFL players for {season} season...")
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
     
-    # Try sources in order of preference
+    # Pull every source; they are merged into one table through the ID crosswalk
     sources = [
-        ("Sleeper API", fetch_sleeper_players),
-        ("ESPN API", fetch_espn_players),  
-        ("NFL.com API", fetch_nfl_players),
+        ("Sleeper API", "sleeper", fetch_sleeper_players),
+        ("ESPN API", "espn", fetch_espn_players),  
+        ("NFL.com API", "nfl", fetch_nfl_players),
+        ("Yahoo Fantasy", "yahoo", fetch_yahoo_players),
     ]
     
-    players_df = None
+    frames = {}
     
-    for source_name, fetch_func in sources:
+    for source_name, key, fetch_func in sources:
         print(f"\n🔄 Trying {source_name}...")
         try:
-            players = fetch_func(season)
-            if players:
-                players_df = pd.DataFrame(players)
+            with span('fetch', source=key) as fetched:
+                players = pd.DataFrame(fetch_func(season))
+                fetched.rows = len(players)
+            if len(players):
+                frames[key] = players
                 print(f"✅ {source_name}: Found {len(players)} players")
                 
                 # Save raw data
                 filename = source_name.lower().replace(" ", "_").replace(".", "")
-                players_df.to_csv(output_path / f"nfl_players_{filename}.csv", index=False)
-                players_df.to_json(output_path / f"nfl_players_{filename}.json", orient='records')
-                
-                break
+                players.to_csv(output_path / f"nfl_players_{filename}.csv", index=False)
+                players.to_json(output_path / f"nfl_players_{filename}.json", orient='records')
             else:
                 print(f"❌ {source_name}: No data returned")
                 
         except Exception as e:
             print(f"❌ {source_name}: Error - {e}")
     
-    if players_df is None:
+    if frames:
+        # Resolve identities across sources; only ids not in the saved crosswalk need matching
+        store_dir = output_path / "store"
+        with span('merge', rows=sum(map(len, frames.values()))):
+            crosswalk = resolve(frames, load_crosswalk(store_dir))
+            save_crosswalk(crosswalk, store_dir)
+            players_df = merge_players(frames, crosswalk)
+        source_key = "merged"
+        print(f"🔗 Merged {sum(map(len, frames.values()))} records from {len(frames)} sources "
+              f"into {len(players_df)} players")
+    else:
         print("❌ All sources failed. Using fallback data...")
         players_df = create_fallback_data()
+        source_key = "fallback"
+    
+    # Clean, standardize and type the data
+    players_df = apply_schema(clean_player_data(players_df))
     
-    # Clean and standardize the data
-    players_df = clean_player_data(players_df)
+    # Log what changed since the last stored snapshot of this source
+    changes = record_changes(players_df, source_key, store_dir=output_path / "store")
+    if len(changes):
+        print(f"🔁 Changes since last pull: {summarize(changes)}")
     
-    # Save final cleaned data
-    players_df.to_csv(output_path / "nfl_players_clean.csv", index=False)
-    players_df.to_json(output_path / "nfl_players_clean.json", orient='records')
+    # Save final cleaned data to the columnar store, plus CSV/JSON exports
+    with span('write', rows=len(players_df), source=source_key):
+        partition = write_partition(players_df, source_key, season, week, store_dir=output_path / "store")
+        players_df.to_csv(output_path / "nfl_players_clean.csv", index=False)
+        players_df.to_json(output_path / "nfl_players_clean.json", orient='records')
     
     print(f"\n🎉 Final dataset: {len(players_df)} players")
-    print(f"💾 Saved to: {output_path}/nfl_players_clean.*")
+    print(f"💾 Saved to: {partition} (exports: {output_path}/nfl_players_clean.*)")
     
     # Print summary stats
     print_player_summary(players_df)
@@ -68,18 +104,23 @@ def fetch_all_nfl_players(season: int = 2024, output_dir: str = "data") -> pd.Da
     return players_df
 
 
-def fetch_sleeper_players(season: int = 2024) -> List[Dict]:
-    """Sleeper has the most comprehensive NFL player database"""
+SLEEPER_COLUMNS = [
+    'player_id', 'name', 'first_name', 'last_name', 'position', 'team', 'jersey_number',
+    'height', 'weight', 'age', 'college', 'rookie_year', 'years_exp', 'fantasy_positions',
+    'injury_status', 'depth_chart_position', 'depth_chart_order', 'search_full_name', 'source',
+]
+
+
+def fetch_sleeper_players(season: int = 2024) -> pd.DataFrame:
+    """
+    Sleeper has the most comprehensive NFL player database
+    The multi-MB dump is parsed as it streams (from the on-disk cache when fresh);
+    only active, rostered players are kept, straight into columns
+    """
     url = "https://api.sleeper.app/v1/players/nfl"
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyDraftBot/1.0)'}
-    
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
+    players = ColumnBuilder(SLEEPER_COLUMNS)
     
-    players_dict = response.json()
-    players = []
-    
-    for player_id, data in players_dict.items():
+    for player_id, data in iter_object_items(get_engine().stream(url, timeout=30)):
         # Filter for active players only
         if not data.get('active', False):
             continue
@@ -111,59 +152,58 @@ def fetch_sleeper_players(season: int = 2024) -> List[Dict]:
         }
         players.append(player)
     
-    return players
+    return players.to_frame()
 
 
 def fetch_espn_players(season: int = 2024) -> List[Dict]:
     """ESPN Fantasy API - good fallback option"""
     players = []
     
-    # ESPN positions to fetch
-    positions = [1, 2, 3, 4, 5, 16]  # QB, RB, WR, TE, K, D/ST
+    # One filtered, paged pass over the player universe, split by position locally
+    by_position = split_by_position(get_espn_player_universe(season))
     
-    for position_id in positions:
-        try:
-            url = "https://fantasy.espn.com/apis/v3/games/ffl/seasons/{}/players".format(season)
-            params = {
-                'view': 'players_wl',
-                'limit': 1000,
+    for records in by_position.values():
+        for player_data in records:
+            player_info = player_data.get('player', player_data)
+            player = {
+                'player_id': f"espn_{player_info.get('id')}",
+                'name': player_info.get('fullName', ''),
+                'first_name': player_info.get('firstName', ''),
+                'last_name': player_info.get('lastName', ''),
+                'position': get_espn_position_name(player_info.get('defaultPositionId', 0)),
+                'team': get_espn_team_name(player_info.get('proTeamId', 0)),
+                'jersey_number': player_info.get('jersey'),
+                'active': player_info.get('active', True),
+                'injury_status': ESPN_INJURY_STATUS.get(player_info.get('injuryStatus'), 'Healthy'),
+                'source': 'espn'
             }
-            headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyDraftBot/1.0)'}
-            
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            for player_data in data.get('players', []):
-                player_info = player_data.get('player', {})
-                
-                # Filter by position
-                if player_info.get('defaultPositionId') != position_id:
-                    continue
-                
-                player = {
-                    'player_id': f"espn_{player_info.get('id')}",
-                    'name': player_info.get('fullName', ''),
-                    'first_name': player_info.get('firstName', ''),
-                    'last_name': player_info.get('lastName', ''),
-                    'position': get_espn_position_name(player_info.get('defaultPositionId', 0)),
-                    'team': get_espn_team_name(player_info.get('proTeamId', 0)),
-                    'jersey_number': player_info.get('jersey'),
-                    'active': player_info.get('active', True),
-                    'injury_status': player_info.get('injuryStatus', 'ACTIVE'),
-                    'source': 'espn'
-                }
-                players.append(player)
-                
-        except Exception as e:
-            print(f"ESPN position {position_id} error: {e}")
-            continue
+            players.append(player)
+    
+    return players
+
+
+def fetch_yahoo_players(season: int = 2024) -> List[Dict]:
+    """Yahoo Fantasy API - only with OAuth credentials in the environment"""
+    if not os.getenv('YAHOO_ACCESS_TOKEN'):
+        return []
     
+    from ml.fetch_all_players import get_all_yahoo_players
+    from ml.yahoo_client import YahooOAuthClient
+    
+    players = []
+    for player in get_all_yahoo_players(YahooOAuthClient(), season):
+        player['player_id'] = f"yahoo_{player.pop('yahoo_id')}"
+        player['source'] = 'yahoo'
+        players.append(player)
     return players
 
 
-def fetch_nfl_players(season: int = 2024) -> List[Dict]:
-    """NFL.com API - official but sometimes limited"""
+NFL_ROSTER_URL = "https://www.nfl.com/api/roster/team/{team}"
+
+
+def fetch_nfl_players(season: int = 2024, base_url: str = NFL_ROSTER_URL,
+                      engine: Optional[FetchEngine] = None) -> List[Dict]:
+    """NFL.com API - official but sometimes limited; all 32 rosters are fetched concurrently"""
     players = []
     teams = [
         'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
@@ -172,39 +212,43 @@ def fetch_nfl_players(season: int = 2024) -> List[Dict]:
         'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS'
     ]
     
-    for team in teams:
-        try:
-            # NFL.com roster endpoint (this URL may need adjustment)
-            url = f"https://www.nfl.com/api/roster/team/{team}"
-            headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyDraftBot/1.0)'}
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            team_data = response.json()
-            
-            for player_data in team_data.get('players', []):
-                player = {
-                    'player_id': f"nfl_{player_data.get('id')}",
-                    'name': f"{player_data.get('firstName', '')} {player_data.get('lastName', '')}".strip(),
-                    'first_name': player_data.get('firstName', ''),
-                    'last_name': player_data.get('lastName', ''),
-                    'position': player_data.get('position', ''),
-                    'team': team,
-                    'jersey_number': player_data.get('jerseyNumber'),
-                    'height': player_data.get('height'),
-                    'weight': player_data.get('weight'),
-                    'college': player_data.get('college', ''),
-                    'source': 'nfl'
-                }
-                players.append(player)
-                
-        except Exception as e:
-            print(f"NFL team {team} error: {e}")
+    # NFL.com roster endpoint (this URL may need adjustment)
+    engine = engine or get_engine()
+    engine.set_host_limit(base_url, ROSTER_PER_HOST)
+    rosters = engine.get_many([base_url.format(team=team) for team in teams])
+    
+    for team, team_data in zip(teams, rosters):
+        if isinstance(team_data, Exception):
+            print(f"NFL team {team} error: {team_data}")
             continue
+        
+        for player_data in team_data.get('players', []):
+            player = {
+                'player_id': f"nfl_{player_data.get('id')}",
+                'name': f"{player_data.get('firstName', '')} {player_data.get('lastName', '')}".strip(),
+                'first_name': player_data.get('firstName', ''),
+                'last_name': player_data.get('lastName', ''),
+                'position': player_data.get('position', ''),
+                'team': team,
+                'jersey_number': player_data.get('jerseyNumber'),
+                'height': player_data.get('height'),
+                'weight': player_data.get('weight'),
+                'college': player_data.get('college', ''),
+                'source': 'nfl'
+            }
+            players.append(player)
     
     return players
 
 
+# ESPN injury codes in Sleeper's vocabulary, so merged statuses read the same
+ESPN_INJURY_STATUS = {
+    'ACTIVE': 'Healthy', 'NORMAL': 'Healthy', 'QUESTIONABLE': 'Questionable',
+    'DOUBTFUL': 'Doubtful', 'OUT': 'Out', 'INJURY_RESERVE': 'IR', 'SUSPENSION': 'Sus',
+    'DAY_TO_DAY': 'Questionable',
+}
+
+
 def get_espn_position_name(position_id: int) -> str:
     """Convert ESPN position ID to name"""
     mapping = {1: 'QB', 2: 'RB', 3: 'WR', 4: 'TE', 5: 'K', 16: 'D/ST'}
@@ -224,10 +268,11 @@ def get_espn_team_name(team_id: int) -> str:
     return mapping.get(team_id, 'FA')
 
 
+@traced('clean', rows=len)
 def clean_player_data(df: pd.DataFrame) -> pd.DataFrame:
     """Clean and standardize player data"""
-    # Remove duplicates based on name and team
-    df = df.drop_duplicates(subset=['name', 'team'], keep='first')
+    # Merged tables are unique per player_id; name+team is the fallback for id-less data
+    df = df.drop_duplicates(subset=['player_id'] if 'player_id' in df.columns else ['name', 'team'], keep='first')
     
     # Clean names
     df['name'] = df['name'].str.strip()
@@ -278,6 +323,8 @@ def print_player_summary(df: pd.DataFrame):
 if __name__ == '__main__':
     # Fetch all players
     players_df = fetch_all_nfl_players(2024, "data")
+    REPORT_PATH.parent.mkdir(exist_ok=True)
+    write_report(REPORT_PATH)
     
     # Show sample
     print("\n📋 Sample Players:")
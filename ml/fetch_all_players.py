@@ -3,6 +3,7 @@ Fetch all active NFL players from Yahoo Fantasy API
 """
 import os
 from ml.yahoo_client import YahooOAuthClient
+from ml.yahoo_flatten import GAME_PLAYERS
 from ml.yahoo_utils import get_player_stats
 import pandas as pd
 
@@ -33,27 +34,10 @@ def get_all_yahoo_players(client: YahooOAuthClient, season=2024):
 
 def parse_yahoo_players(response):
     """Parse Yahoo API response to extract player data"""
-    players = []
-    # Yahoo returns nested XML-like JSON structure
-    # This is a template - adjust based on actual response structure
-    
-    fantasy_content = response.get('fantasy_content', {})
-    game = fantasy_content.get('game', {})
-    player_list = game.get('players', {})
-    
-    # Navigate Yahoo's nested structure
-    for player_data in player_list.get('player', []):
-        if isinstance(player_data, dict):
-            player = {
-                'yahoo_id': player_data.get('player_key'),
-                'name': player_data.get('name', {}).get('full', ''),
-                'position': player_data.get('display_position', ''),
-                'team': player_data.get('editorial_team_abbr', ''),
-                'status': player_data.get('status', ''),
-                'injury_note': player_data.get('injury_note', '')
-            }
-            players.append(player)
-    
+    # fantasy_content -> game -> players -> {"0": {"player": [[...attributes]]}, ..., "count": n}
+    players = GAME_PLAYERS.records(response)
+    for player in players:
+        player['yahoo_id'] = player.pop('player_key')
     return players
 
 
@@ -0,0 +1,157 @@
+"""
+Concurrent HTTP fetch engine shared by the player/roster fetchers
+A bounded thread pool over one pooled keep-alive requests.Session, with per-host
+concurrency limits, per-request timeouts, retry with exponential backoff and an
+optional on-disk conditional response cache
+"""
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+from ml.http_cache import ResponseCache
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyDraftBot/1.0)'}
+
+# Requests in flight per host unless a caller raises it with set_host_limit: the 32-team
+# roster fan-outs raise their host to ROSTER_PER_HOST so they go out in two rounds
+DEFAULT_PER_HOST = 8
+ROSTER_PER_HOST = 16
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Retry connection problems, timeouts, 429 and 5xx; not other client errors"""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+class FetchEngine:
+    """
+    Pooled session + bounded worker pool for fanning out GET requests
+    The pool can serve several hosts at once; per_host caps how many requests any one host
+    gets at a time, and set_host_limit changes that cap for a single host
+    """
+
+    def __init__(self, max_workers: int = 32, per_host: int = DEFAULT_PER_HOST, timeout: float = 15,
+                 retries: int = 3, headers: Optional[Dict] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self._retrying = Retrying(stop=stop_after_attempt(retries), wait=wait_exponential(min=1, max=10),
+                                  retry=retry_if_exception(is_retryable), reraise=True)
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._host_slots[urlsplit(url).netloc]
+
+    def set_host_limit(self, url: str, limit: int):
+        """Allow `limit` requests in flight to the host of url (requests already running keep their slot)"""
+        with self._lock:
+            self._host_slots[urlsplit(url).netloc] = threading.BoundedSemaphore(min(limit, self.max_workers))
+
+    def _get_once(self, url: str, params=None, headers=None, timeout=None, stream=False) -> requests.Response:
+        with self._slot(url):
+            r = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout,
+                                 stream=stream)
+        r.raise_for_status()
+        return r
+
+    def _fetch(self, url: str, params=None, headers=None, timeout=None, stream=False) -> requests.Response:
+        return self._retrying.copy()(self._get_once, url, params, headers, timeout, stream)
+
+    def get(self, url: str, params=None, headers=None, timeout=None) -> requests.Response:
+        """GET with per-host limit, timeout, retry/backoff and (if configured) the response cache"""
+        if self.cache is None:
+            return self._fetch(url, params, headers, timeout)
+        entry = self.cache.lookup(url, params, headers)
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry.response()
+        conditional = dict(headers or {}, **(entry.validators() if entry is not None else {}))
+        r = self._fetch(url, params, conditional, timeout)
+        if r.status_code == 304 and entry is not None:
+            self.cache.touch(entry)
+            return entry.response()
+        self.cache.store(url, params, headers, r)
+        return r
+
+    def stream(self, url: str, params=None, headers=None, timeout=None,
+               chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        """
+        Body of a GET as byte chunks, read from the cache when fresh
+        On a cache miss the body is compressed into the cache while it streams through
+        """
+        entry = self.cache.lookup(url, params, headers) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            yield from entry.iter_body(chunk_size)
+            return
+        conditional = dict(headers or {}, **(entry.validators() if entry is not None else {}))
+        r = self._fetch(url, params, conditional, timeout, stream=True)
+        writer = None
+        try:
+            if r.status_code == 304 and entry is not None:
+                self.cache.touch(entry)
+                yield from entry.iter_body(chunk_size)
+                return
+            if self.cache is not None and self.cache.cacheable(url, r):
+                writer = self.cache.writer(url, params, headers, r)
+            for chunk in r.iter_content(chunk_size):
+                if writer is not None:
+                    writer.write(chunk)
+                yield chunk
+            if writer is not None:
+                writer.commit()
+                writer = None
+        finally:
+            if writer is not None:
+                writer.discard()
+            r.close()
+
+    def get_json(self, url: str, params=None, headers=None, timeout=None):
+        return self.get(url, params, headers, timeout).json()
+
+    def map(self, fn, items: List) -> List:
+        """
+        Run fn over items on the worker pool and return results in input order
+        A failed call yields its exception in place of a result, like gather(return_exceptions=True)
+        """
+        def call(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(items)))) as pool:
+            return list(pool.map(call, items))
+
+    def get_many(self, urls: List[str], params=None, headers=None) -> List:
+        """GET every URL concurrently; JSON bodies (or exceptions) in input order"""
+        return self.map(lambda url: self.get_json(url, params, headers), urls)
+
+    def close(self):
+        self.session.close()
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_engine() -> FetchEngine:
+    """Process-wide cached engine so every fetcher reuses the same connection pool"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = FetchEngine(cache=ResponseCache())
+        return _default_engine
@@ -1,9 +1,25 @@
 """
 Fetch all active NFL players from ESPN API (free, no auth)
 """
+import json
+import sys
+from pathlib import Path
+from typing import List, Dict, Optional
 import requests
 import pandas as pd
-from typing import List, Dict
+
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ml.fetch_engine import FetchEngine, get_engine
+
+ESPN_PLAYERS_URL = "https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}/players"
+ESPN_PAGE_SIZE = 250
+
+# Fantasy-relevant ESPN defaultPositionIds and the lineup slot ids used to filter server-side
+ESPN_POSITION_IDS = [1, 2, 3, 4, 5, 16]  # QB, RB, WR, TE, K, D/ST
+ESPN_SLOT_IDS = [0, 2, 4, 6, 17, 16]  # QB, RB, WR, TE, K, D/ST
 
 
 def get_espn_players(season: int = 2024) -> List[Dict]:
@@ -13,42 +29,73 @@ def get_espn_players(season: int = 2024) -> List[Dict]:
     """
     players = []
     
-    # ESPN's fantasy API endpoint for NFL players
-    base_url = f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}"
-    
-    # Get all teams first
-    teams_url = f"{base_url}/segments/0/leagues/0"
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyBot/1.0)'}
-    
     try:
-        # ESPN method 1: Get player universe
-        players_url = f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}/players"
-        params = {
-            'view': 'players_wl',
-            'limit': 2000,  # Adjust as needed
-        }
-        
-        response = requests.get(players_url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        for player_data in data.get('players', []):
+        # ESPN method 1: Get player universe (one filtered, paged pass)
+        for player_data in get_espn_player_universe(season):
             player = parse_espn_player(player_data)
             if player:
                 players.append(player)
                 
     except requests.RequestException as e:
         print(f"ESPN API error: {e}")
-        # Fallback: try position-by-position
-        players = get_espn_players_by_position(season)
     
     return players
 
 
+def espn_filter(limit: int, offset: int) -> str:
+    """X-Fantasy-Filter header: active fantasy-position players, one page"""
+    return json.dumps({'players': {
+        'filterActive': {'value': True},
+        'filterSlotIds': {'value': ESPN_SLOT_IDS},
+        'limit': limit,
+        'offset': offset,
+        'sortPercOwned': {'sortPriority': 1, 'sortAsc': False},
+    }})
+
+
+def get_espn_player_universe(season: int = 2024, engine: Optional[FetchEngine] = None,
+                             page_size: int = ESPN_PAGE_SIZE, concurrency: int = 4,
+                             url: str = ESPN_PLAYERS_URL) -> List[Dict]:
+    """
+    Raw ESPN player records for every active fantasy-position player, fetched once
+    Filtering and paging happen server-side; pages are requested `concurrency` at a time
+    until a short page marks the end
+    """
+    engine = engine or get_engine()
+    url = url.format(season=season)
+    records = []
+    offset = 0
+    while True:
+        offsets = [offset + i * page_size for i in range(concurrency)]
+        pages = engine.map(lambda o: engine.get_json(url, params={'view': 'players_wl'},
+                                                     headers={'X-Fantasy-Filter': espn_filter(page_size, o)}),
+                           offsets)
+        for page in pages:
+            if isinstance(page, Exception):
+                raise page
+            page = page if isinstance(page, list) else page.get('players', [])
+            records.extend(page)
+            if len(page) < page_size:
+                return records
+        offset += concurrency * page_size
+
+
+def split_by_position(records: List[Dict]) -> Dict[str, List[Dict]]:
+    """Group raw ESPN records by position name, locally"""
+    by_position = {}
+    for record in records:
+        info = record.get('player', record)
+        position_id = info.get('defaultPositionId', 0)
+        if position_id in ESPN_POSITION_IDS:
+            by_position.setdefault(get_position_name(position_id), []).append(record)
+    return by_position
+
+
 def parse_espn_player(player_data: Dict) -> Dict:
     """Parse ESPN player data structure"""
     try:
-        player_info = player_data.get('player', {})
+        # kona views nest the record under 'player'; players_wl returns it directly
+        player_info = player_data.get('player', player_data)
         
         return {
             'espn_id': player_info.get('id'),
@@ -90,34 +137,11 @@ def get_team_name(team_id: int) -> str:
     return team_map.get(team_id, 'FA')  # FA = Free Agent
 
 
-def get_espn_players_by_position(season: int) -> List[Dict]:
-    """Fallback method: get players by position"""
-    players = []
-    positions = ['QB', 'RB', 'WR', 'TE', 'K', 'D/ST']
-    
-    for pos in positions:
-        try:
-            url = f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}/players"
-            params = {
-                'view': 'players_wl',
-                'limit': 500,
-                'filter': f'{{"filterActive":true,"filterPosition":["{pos}"]}}'
-            }
-            headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyBot/1.0)'}
-            
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            for player_data in data.get('players', []):
-                player = parse_espn_player(player_data)
-                if player:
-                    players.append(player)
-                    
-        except Exception as e:
-            print(f"Error fetching {pos} players: {e}")
-    
-    return players
+def get_espn_players_by_position(season: int) -> Dict[str, List[Dict]]:
+    """Parsed players grouped by position, from a single universe fetch"""
+    by_position = split_by_position(get_espn_player_universe(season))
+    return {pos: [p for p in map(parse_espn_player, records) if p]
+            for pos, records in by_position.items()}
 
 
 if __name__ == '__main__':
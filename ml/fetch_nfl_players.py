@@ -1,20 +1,28 @@
 """
 Fetch all active NFL players from NFL.com API (free)
 """
-import requests
+import sys
+from pathlib import Path
+from typing import List, Dict, Optional
 import pandas as pd
-from typing import List, Dict
 
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def get_nfl_players(season: int = 2024) -> List[Dict]:
+from ml.fetch_engine import ROSTER_PER_HOST, FetchEngine, get_engine
+
+
+def get_nfl_players(season: int = 2024, base_url: str = "https://api.nfl.com/v1/rosterplayers",
+                    engine: Optional[FetchEngine] = None) -> List[Dict]:
     """
     Get all NFL players from NFL.com API
     This is the most comprehensive free source
+    All team rosters are requested concurrently over one pooled session
     """
     players = []
     
     # NFL.com roster endpoint
-    base_url = "https://api.nfl.com/v1/rosterplayers"
     headers = {
         'User-Agent': 'Mozilla/5.0 (compatible; FantasyBot/1.0)',
         'Accept': 'application/json'
@@ -23,20 +31,18 @@ def get_nfl_players(season: int = 2024) -> List[Dict]:
     # Get all 32 NFL teams
     teams = get_nfl_teams()
     
-    for team_abbr in teams:
-        try:
-            # NFL API endpoint for team rosters
-            url = f"{base_url}?team={team_abbr}&season={season}"
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            
-            team_data = response.json()
-            team_players = parse_nfl_roster(team_data, team_abbr)
-            players.extend(team_players)
-            
-        except requests.RequestException as e:
-            print(f"Error fetching {team_abbr} roster: {e}")
+    # NFL API endpoint for team rosters
+    engine = engine or get_engine()
+    engine.set_host_limit(base_url, ROSTER_PER_HOST)
+    urls = [f"{base_url}?team={team_abbr}&season={season}" for team_abbr in teams]
+    rosters = engine.get_many(urls, headers=headers)
+    
+    for team_abbr, team_data in zip(teams, rosters):
+        if isinstance(team_data, Exception):
+            print(f"Error fetching {team_abbr} roster: {team_data}")
             continue
+        team_players = parse_nfl_roster(team_data, team_abbr)
+        players.extend(team_players)
     
     return players
 
@@ -89,10 +95,9 @@ def get_sleeper_players() -> List[Dict]:
     """
     try:
         url = "https://api.sleeper.app/v1/players/nfl"
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyBot/1.0)'}
         
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        # Served from the on-disk cache (revalidated with ETag/Last-Modified) when possible
+        response = get_engine().get(url, timeout=30)
         
         players_dict = response.json()
         players = []
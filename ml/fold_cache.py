@@ -0,0 +1,51 @@
+"""
+Cross-validation fold cache shared by every model family
+Each fold split and its float32 matrices are computed once; the scaled copy is
+only built if some model asks for it
+"""
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+
+class FoldCache:
+    """Fold matrices computed once and handed read-only to all models"""
+
+    def __init__(self, X, y, folds):
+        self.X = np.ascontiguousarray(X, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.folds = [(np.asarray(train_idx), np.asarray(test_idx)) for train_idx, test_idx in folds]
+        self._raw = {}
+        self._scaled = {}
+        self._full_scaled = None
+        self._scaler = None
+
+    def __len__(self):
+        return len(self.folds)
+
+    def get(self, fold: int, scaled: bool = False):
+        """(X_train, y_train, X_test, y_test) for one fold"""
+        if fold not in self._raw:
+            train_idx, test_idx = self.folds[fold]
+            self._raw[fold] = (self.X[train_idx], self.y[train_idx], self.X[test_idx], self.y[test_idx])
+        if not scaled:
+            return self._raw[fold]
+        if fold not in self._scaled:
+            X_train, y_train, X_test, y_test = self._raw[fold]
+            scaler = StandardScaler().fit(X_train)
+            self._scaled[fold] = (scaler.transform(X_train), y_train, scaler.transform(X_test), y_test)
+        return self._scaled[fold]
+
+    def full(self, scaled: bool = False):
+        """(X, y) over all rows for the final fit"""
+        if not scaled:
+            return self.X, self.y
+        if self._full_scaled is None:
+            self._full_scaled = self.scaler.transform(self.X)
+        return self._full_scaled, self.y
+
+    @property
+    def scaler(self) -> StandardScaler:
+        """The single scaler fit on all rows (persisted alongside the models)"""
+        if self._scaler is None:
+            self._scaler = StandardScaler().fit(self.X)
+        return self._scaler
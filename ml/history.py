@@ -0,0 +1,252 @@
+"""
+Historical player-week dataset: lagged / rolling / EWMA features from weekly stat partitions
+Weekly stats live in the columnar store (source=weekly/season=/week=); features are cached
+one Parquet file per week under data/features/history, with per-player window state so a
+new week is appended without recomputing older windows
+
+Import a week with: python -m ml.storage week.csv --source weekly --season 2024 --week 3
+Build/append with:  python -m ml.history [--rebuild]
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.storage import STORE_DIR, WEEKLY_SOURCE, WEEKLY_STAT_COLUMNS, list_partitions, read_partition
+
+HISTORY_DIR = ROOT / 'data' / 'features' / 'history'
+KEY_COLUMNS = ['player_id', 'season', 'week']
+TARGET = 'fantasy_points'
+
+# Counting stats read from each weekly partition (missing stats count as 0)
+STAT_COLUMNS = list(WEEKLY_STAT_COLUMNS)
+# Per-week stats the windows run over; target_share is derived from targets per team-week
+ROLL_STATS = ['fantasy_points', 'targets', 'carries', 'target_share']
+WINDOWS = (3, 8)
+EWMA_ALPHA = 0.3
+
+
+def load_weekly(store_dir: Path = STORE_DIR, source: str = WEEKLY_SOURCE, since=None) -> pd.DataFrame:
+    """Player-week stat rows from the store, optionally only weeks after (season, week) `since`"""
+    frames = []
+    for season, week, path in list_partitions(source, store_dir):
+        if since is not None and (season, week) <= tuple(since):
+            continue
+        df = read_partition(path)
+        frames.append(df.assign(season=np.int16(season), week=np.int8(week)))
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS + ['team'] + STAT_COLUMNS)
+    return prepare_weekly(pd.concat(frames, ignore_index=True))
+
+
+def prepare_weekly(weekly: pd.DataFrame) -> pd.DataFrame:
+    """Typed, (player, season, week)-sorted rows with target_share per team-week"""
+    weekly = weekly.copy()
+    weekly['player_id'] = weekly['player_id'].astype('string')
+    for col in STAT_COLUMNS:
+        weekly[col] = pd.to_numeric(weekly[col], errors='coerce').astype('float32').fillna(0) \
+            if col in weekly.columns else np.float32(0)
+    team_targets = weekly.groupby(['team', 'season', 'week'], observed=True)['targets'].transform('sum')
+    weekly['target_share'] = (weekly['targets'] / team_targets.where(team_targets > 0)).fillna(0).astype('float32')
+    return weekly.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+
+
+def _group_starts(player_ids: pd.Series) -> np.ndarray:
+    """Index of the first row of each row's player (rows sorted by player)"""
+    codes = player_ids.to_numpy()
+    new_group = np.empty(len(codes), dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(new_group, np.arange(len(codes)), 0))
+
+
+def window_features(weekly: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lag-1 and trailing-mean features over each player's previous weeks (never the current one)
+    One cumulative sum per stat: a window mean is a difference of two prefix sums
+    """
+    starts = _group_starts(weekly['player_id'])
+    idx = np.arange(len(weekly))
+    has_prev = idx > starts
+    out = {'weeks_played': (idx - starts).astype('float32')}
+    for stat in ROLL_STATS:
+        values = weekly[stat].to_numpy(dtype=np.float64)
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        prev = np.where(has_prev, values[np.maximum(idx - 1, 0)], np.nan)
+        out[f'{stat}_lag1'] = prev
+        for n in WINDOWS:
+            lo = np.maximum(starts, idx - n)
+            count = idx - lo
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[f'{stat}_mean{n}'] = np.where(count > 0, (prefix[idx] - prefix[lo]) / count, np.nan)
+    features = pd.DataFrame(out, index=weekly.index)
+    short, long = WINDOWS[0], WINDOWS[-1]
+    features['target_share_trend'] = features[f'target_share_mean{short}'] - features[f'target_share_mean{long}']
+    return features
+
+
+def ewma_state(weekly: pd.DataFrame) -> pd.DataFrame:
+    """EWMA of each stat including the current week (adjust=False, so it is a carryable state)"""
+    ewm = weekly.groupby('player_id', sort=False)[ROLL_STATS].ewm(alpha=EWMA_ALPHA, adjust=False).mean()
+    return ewm.reset_index(level=0, drop=True).sort_index()
+
+
+def _finish(features: pd.DataFrame) -> pd.DataFrame:
+    """Keys keep their types; features and target are float32"""
+    values = [c for c in features.columns if c not in KEY_COLUMNS]
+    return features.astype({c: 'float32' for c in values}).reset_index(drop=True)
+
+
+def _state(weekly: pd.DataFrame, ewm: pd.DataFrame, weeks: pd.Series) -> Dict:
+    """Carry-over for appends: each player's last max(WINDOWS) rows, latest EWMA and week count"""
+    last = ewm.groupby(weekly['player_id'], sort=False).tail(1)
+    latest = pd.concat([weekly.loc[last.index, ['player_id']], last, weeks.loc[last.index].rename('weeks')], axis=1)
+    return {
+        'tail': weekly.groupby('player_id', sort=False).tail(max(WINDOWS)).reset_index(drop=True),
+        'ewm': latest.reset_index(drop=True),
+    }
+
+
+def build_history_features(weekly: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    """Full build: (feature rows with target, carry-over state) for every player-week"""
+    ewm = ewma_state(weekly)
+    prev_ewm = ewm.groupby(weekly['player_id'], sort=False).shift(1).add_suffix('_ewm')
+    windows = window_features(weekly)
+    features = pd.concat([weekly[KEY_COLUMNS], windows, prev_ewm], axis=1)
+    features[TARGET] = weekly[TARGET]
+    return _finish(features), _state(weekly, ewm, windows['weeks_played'] + 1)
+
+
+def append_week(new: pd.DataFrame, state: Dict) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Features for one newly arrived week, computed from the carried state only
+    Windows run over the players' last max(WINDOWS) rows and the EWMA continues from its last value
+    """
+    new = prepare_weekly(new)
+    combined = pd.concat([state['tail'], new], ignore_index=True)
+    combined = combined.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+    is_new = combined.set_index(KEY_COLUMNS).index.isin(new.set_index(KEY_COLUMNS).index)
+    rows = combined[is_new]
+
+    carried = state['ewm'].set_index('player_id').reindex(rows['player_id']).set_axis(rows.index)
+    x = rows[ROLL_STATS].astype('float64')
+    ewm = (EWMA_ALPHA * x + (1 - EWMA_ALPHA) * carried[ROLL_STATS]).fillna(x)
+    weeks = carried['weeks'].fillna(0)
+
+    windows = window_features(combined)[is_new]
+    windows['weeks_played'] = weeks  # the tail is capped, the carried count is not
+    features = pd.concat([rows[KEY_COLUMNS], windows, carried[ROLL_STATS].add_suffix('_ewm')], axis=1)
+    features[TARGET] = rows[TARGET]
+
+    updated = pd.concat([rows[['player_id']], ewm, (weeks + 1).rename('weeks')], axis=1)
+    kept = state['ewm'][~state['ewm']['player_id'].isin(rows['player_id'])]
+    return _finish(features), {
+        'tail': combined.groupby('player_id', sort=False).tail(max(WINDOWS)).reset_index(drop=True),
+        'ewm': pd.concat([kept, updated], ignore_index=True),
+    }
+
+
+def history_version() -> str:
+    """Hash of the feature code and window settings; a change forces a rebuild"""
+    h = hashlib.sha256(json.dumps([STAT_COLUMNS, ROLL_STATS, WINDOWS, EWMA_ALPHA]).encode('utf-8'))
+    for fn in (prepare_weekly, window_features, ewma_state, build_history_features, append_week):
+        h.update(inspect.getsource(fn).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+def save_weeks(features: pd.DataFrame, out_dir: Path = HISTORY_DIR):
+    """One Parquet file per season/week, so appending never rewrites older weeks"""
+    for (season, week), part in features.groupby(['season', 'week'], sort=True):
+        _write_parquet(part, out_dir / f'season={season}' / f'week={week}.parquet')
+
+
+def save_state(state: Dict, out_dir: Path, last: Tuple[int, int]):
+    _write_parquet(state['tail'], out_dir / 'state_tail.parquet')
+    _write_parquet(state['ewm'], out_dir / 'state_ewm.parquet')
+    # meta.json last: it marks the cache consistent
+    with open(out_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': history_version(), 'last': list(last)}, f, indent=2)
+
+
+def load_meta(out_dir: Path = HISTORY_DIR) -> Optional[Dict]:
+    try:
+        with open(out_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_history_features(out_dir: Path = HISTORY_DIR, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """All cached player-week feature rows, oldest week first"""
+    paths = sorted(out_dir.glob('season=*/week=*.parquet'),
+                   key=lambda p: (int(p.parent.name.split('=')[1]), int(p.stem.split('=')[1])))
+    if not paths:
+        return pd.DataFrame(columns=columns)
+    return pd.concat([pd.read_parquet(p, columns=columns) for p in paths], ignore_index=True)
+
+
+def update_history(store_dir: Path = STORE_DIR, out_dir: Path = HISTORY_DIR, rebuild: bool = False):
+    """
+    Bring the feature cache up to date with the weekly partitions: append weeks after the last
+    cached one, or rebuild everything (first run, --rebuild, or changed feature code)
+    Returns (mode, rows written); weeks imported out of order need a rebuild
+    """
+    meta = load_meta(out_dir)
+    if rebuild or meta is None or meta['version'] != history_version():
+        weekly = load_weekly(store_dir)
+        if weekly.empty:
+            return 'empty', 0
+        features, state = build_history_features(weekly)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        save_weeks(features, out_dir)
+        last = weekly[['season', 'week']].iloc[np.lexsort((weekly['week'], weekly['season']))[-1]]
+        save_state(state, out_dir, (int(last['season']), int(last['week'])))
+        return 'rebuilt', len(features)
+
+    new = load_weekly(store_dir, since=meta['last'])
+    if new.empty:
+        return 'current', 0
+    state = {'tail': pd.read_parquet(out_dir / 'state_tail.parquet'),
+             'ewm': pd.read_parquet(out_dir / 'state_ewm.parquet')}
+    written = 0
+    for (season, week), rows in new.groupby(['season', 'week'], sort=True):
+        features, state = append_week(rows, state)
+        save_weeks(features, out_dir)
+        save_state(state, out_dir, (int(season), int(week)))
+        written += len(features)
+    return 'appended', written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or extend the player-week history feature cache')
+    parser.add_argument('--rebuild', action='store_true', help='recompute every week from scratch')
+    args = parser.parse_args()
+    mode, rows = update_history(rebuild=args.rebuild)
+    if mode == 'empty':
+        print(f"⚠️  No weekly stat partitions in {STORE_DIR / f'source={WEEKLY_SOURCE}'}")
+    elif mode == 'current':
+        print("✅ History features are up to date")
+    else:
+        print(f"💾 {mode.capitalize()} history features: {rows} player-weeks -> {HISTORY_DIR}")
+
+
+if __name__ == '__main__':
+    main()
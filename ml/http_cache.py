@@ -0,0 +1,182 @@
+"""
+On-disk HTTP response cache with conditional revalidation
+Bodies are stored compressed (gzip, or brotli when installed); entries younger than
+their endpoint TTL are served without a request, older ones are revalidated with
+If-None-Match / If-Modified-Since and refreshed on 304
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import requests
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / 'data' / 'http_cache'
+
+# Seconds a response is served without revalidation, by URL prefix (scheme stripped)
+DEFAULT_TTLS = {
+    'api.sleeper.app/v1/players/': 24 * 3600,  # Sleeper asks for at most one pull per day
+    'fantasy.espn.com/apis/': 3600,
+    'www.nfl.com/api/': 3600,
+    'api.nfl.com/': 3600,
+}
+
+# Codec name -> body file suffix
+_CODECS = {'gzip': '.gz'}
+if brotli is not None:
+    _CODECS['br'] = '.br'
+
+# Response headers kept with the body
+_KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheEntry:
+    """One cached response: metadata plus a compressed body file"""
+
+    def __init__(self, meta_path: Path, meta: Dict):
+        self.meta_path = meta_path
+        self.meta = meta
+
+    @property
+    def body_path(self) -> Path:
+        return self.meta_path.with_suffix(_CODECS[self.meta['codec']])
+
+    def age(self) -> float:
+        return time.time() - self.meta['fetched_at']
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidation"""
+        headers = {}
+        if self.meta['headers'].get('ETag'):
+            headers['If-None-Match'] = self.meta['headers']['ETag']
+        if self.meta['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = self.meta['headers']['Last-Modified']
+        return headers
+
+    def iter_body(self, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        """Decompressed body in chunks, without loading it all"""
+        if self.meta['codec'] == 'gzip':
+            with gzip.open(self.body_path, 'rb') as f:
+                yield from iter(lambda: f.read(chunk_size), b'')
+            return
+        decompressor = brotli.Decompressor()
+        with open(self.body_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield decompressor.process(chunk)
+
+    def body(self) -> bytes:
+        return b''.join(self.iter_body())
+
+    def response(self) -> requests.Response:
+        """The cached body as a 200 requests.Response"""
+        r = requests.Response()
+        r.status_code = 200
+        r.url = self.meta['url']
+        r.headers.update(self.meta['headers'])
+        r.encoding = 'utf-8'
+        r._content = self.body()
+        return r
+
+
+class ResponseCache:
+    """Compressed on-disk responses keyed by URL, params and per-request headers"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 0, codec: str = 'gzip'):
+        if codec not in _CODECS:
+            raise ValueError(f"Unsupported cache codec {codec!r} (available: {sorted(_CODECS)})")
+        self.cache_dir = Path(cache_dir)
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.codec = codec
+
+    def ttl(self, url: str) -> float:
+        """TTL of the longest matching endpoint prefix"""
+        bare = url.split('://', 1)[-1]
+        matches = [prefix for prefix in self.ttls if bare.startswith(prefix)]
+        return self.ttls[max(matches, key=len)] if matches else self.default_ttl
+
+    def _meta_path(self, url: str, params=None, headers=None) -> Path:
+        key = json.dumps([url, sorted((params or {}).items()), sorted((headers or {}).items())])
+        return self.cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def lookup(self, url: str, params=None, headers=None) -> Optional[CacheEntry]:
+        meta_path = self._meta_path(url, params, headers)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = CacheEntry(meta_path, json.load(f))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.meta.get('codec') in _CODECS and entry.body_path.exists() else None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.ttl(entry.meta['url'])
+
+    def cacheable(self, url: str, response: requests.Response) -> bool:
+        """A 200 response that can be reused (has a TTL or a validator)"""
+        return response.status_code == 200 and (
+            self.ttl(url) > 0 or 'ETag' in response.headers or 'Last-Modified' in response.headers)
+
+    def writer(self, url: str, params, headers, response: requests.Response) -> 'CacheWriter':
+        """Writer that streams a response body into a new entry"""
+        kept = {h: response.headers[h] for h in _KEPT_HEADERS if h in response.headers}
+        meta = {'url': url, 'headers': kept, 'fetched_at': time.time(), 'codec': self.codec}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return CacheWriter(CacheEntry(self._meta_path(url, params, headers), meta))
+
+    def store(self, url: str, params, headers, response: requests.Response) -> Optional[CacheEntry]:
+        """Cache a fully read response if it is cacheable"""
+        if not self.cacheable(url, response):
+            return None
+        writer = self.writer(url, params, headers, response)
+        writer.write(response.content)
+        return writer.commit()
+
+    def touch(self, entry: CacheEntry):
+        """Mark a revalidated (304) entry as freshly fetched"""
+        entry.meta['fetched_at'] = time.time()
+        _write_atomic(entry.meta_path, json.dumps(entry.meta).encode('utf-8'))
+
+
+class CacheWriter:
+    """Compresses a body into a temp file; commit() publishes body then metadata"""
+
+    def __init__(self, entry: CacheEntry):
+        self.entry = entry
+        self.tmp = entry.body_path.with_name(f"{entry.body_path.name}.{os.getpid()}.{id(self)}.tmp")
+        if entry.meta['codec'] == 'gzip':
+            self._file = gzip.open(self.tmp, 'wb')
+            self._compressor = None
+        else:
+            self._file = open(self.tmp, 'wb')
+            self._compressor = brotli.Compressor()
+
+    def write(self, chunk: bytes):
+        self._file.write(self._compressor.process(chunk) if self._compressor else chunk)
+
+    def commit(self) -> CacheEntry:
+        if self._compressor:
+            self._file.write(self._compressor.finish())
+        self._file.close()
+        # Body first, metadata last, each via rename so readers never see a partial entry
+        self.tmp.replace(self.entry.body_path)
+        _write_atomic(self.entry.meta_path, json.dumps(self.entry.meta).encode('utf-8'))
+        return self.entry
+
+    def discard(self):
+        self._file.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
@@ -0,0 +1,358 @@
+"""
+Batched inference for the RF/XGB/LGB ensemble
+The models and the shared scaler are loaded once; each predict call converts the batch to
+float32 C-order once, transforms it at most once, runs each member with its own thread
+budget and accumulates the average in place
+
+engine='numpy' evaluates the same trees from a compact array-of-nodes form (one flat node
+table per model) with vectorized NumPy gathers, for consumers that should not import the
+three model libraries on the scoring path
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.artifacts import MODEL_NAMES, NEEDS_SCALING, OUT_DIR, ModelBundle
+
+# Batches smaller than this run each model on one thread (pool start-up costs more)
+SINGLE_THREAD_ROWS = 2_000
+# engine='auto' walks the node arrays below this many rows: sklearn's forest predict has
+# ~10ms of fixed overhead per call, the NumPy walk ~0.5ms for a single row
+AUTO_NUMPY_ROWS = 512
+# (rows x trees) nodes walked per chunk in the NumPy engine: small enough to stay in cache
+CHUNK_NODES = 32_768
+
+# How a node treats missing values: NaN compared as 0 (LightGBM 'None'), 0/NaN take the
+# default branch (LightGBM 'Zero'), NaN takes the default branch (XGBoost, sklearn, LightGBM 'NaN')
+MISSING_AS_ZERO, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+ZERO_THRESHOLD = 1e-35  # LightGBM's |x| below which a value counts as zero
+
+
+class CompiledForest:
+    """
+    Tree ensemble as flat node arrays: prediction = bias + scale * sum of one leaf per tree
+    Leaves point to themselves, so every row walks exactly `depth` levels without masking
+    """
+    ARRAYS = ('feature', 'threshold', 'children', 'default_left', 'missing', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children, default_left, missing, value, roots, depth: int,
+                 strict: bool = False, scale: float = 1.0, bias: float = 0.0):
+        # Walk-ready arrays as built by from_trees; they may be read-only memory maps
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children  # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.default_left = default_left
+        self.missing = missing
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.strict = strict  # XGBoost goes left on x < t, sklearn and LightGBM on x <= t
+        self.scale = scale
+        self.bias = bias
+        self.zero_missing = bool((missing == MISSING_ZERO).any())
+
+    @classmethod
+    def from_trees(cls, feature, threshold, left, right, default_left, missing, value, roots, **kwargs):
+        """From concatenated per-node arrays (feature -1 and children -1 on leaves)"""
+        feature = np.asarray(feature, dtype=np.int32)
+        leaf = feature < 0
+        ids = np.arange(len(feature), dtype=np.int32)
+        left = np.where(leaf, ids, left).astype(np.int32)
+        right = np.where(leaf, ids, right).astype(np.int32)
+        roots = np.asarray(roots, dtype=np.int32)
+        return cls(np.where(leaf, 0, feature).astype(np.int32), np.asarray(threshold),
+                   np.stack([left, right], axis=1).ravel(), np.asarray(default_left, dtype=bool),
+                   np.where(leaf, MISSING_NAN, missing).astype(np.int8), np.asarray(value, dtype=np.float64),
+                   roots, _tree_depth(roots, leaf, left, right), **kwargs)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {key: getattr(self, key) for key in self.ARRAYS}
+
+    def attrs(self) -> Dict:
+        return {'depth': self.depth, 'strict': self.strict, 'scale': self.scale, 'bias': self.bias}
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
+
+    def _go_left(self, x, node, check_missing: bool):
+        threshold = self.threshold[node]
+        go_left = x < threshold if self.strict else x <= threshold
+        if check_missing:
+            isnan = np.isnan(x)
+            mode = self.missing[node]
+            missing = (isnan & (mode != MISSING_AS_ZERO)) | ((mode == MISSING_ZERO) & (np.abs(x) <= ZERO_THRESHOLD))
+            as_zero = isnan & (mode == MISSING_AS_ZERO)
+            go_left = np.where(as_zero, 0 < threshold if self.strict else 0 <= threshold, go_left)
+            go_left = np.where(missing, self.default_left[node], go_left)
+        return go_left
+
+    def predict(self, X, chunk_rows: Optional[int] = None) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        chunk_rows = chunk_rows or max(1, CHUNK_NODES // self.n_trees)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            check_missing = self.zero_missing or bool(np.isnan(chunk).any())
+            # Flat offsets into the chunk: row * n_features + feature
+            row_offsets = (np.arange(len(chunk), dtype=np.int64) * chunk.shape[1])[:, None]
+            flat = chunk.ravel()
+            node = np.broadcast_to(self.roots, (len(chunk), self.n_trees))
+            for _ in range(self.depth):
+                x = flat[row_offsets + self.feature[node]]
+                go_right = ~self._go_left(x, node, check_missing)
+                node = self.children[2 * node + go_right]
+            np.sum(self.value[node], axis=1, out=out[start:start + len(chunk)])
+        out *= self.scale
+        out += self.bias
+        return out
+
+
+def _tree_depth(roots, leaf, left, right) -> int:
+    """Levels below the deepest root-to-leaf path"""
+    frontier, depth = roots, 0
+    while True:
+        frontier = frontier[~leaf[frontier]]
+        if not len(frontier):
+            return depth
+        frontier = np.concatenate([left[frontier], right[frontier]])
+        depth += 1
+
+
+def _assemble(trees: Iterable[Dict], **kwargs) -> CompiledForest:
+    """Concatenate per-tree node arrays (child ids local to the tree, -1 for none)"""
+    parts = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'default_left', 'missing', 'value')}
+    roots, offset = [], 0
+    for tree in trees:
+        roots.append(offset)
+        for key in parts:
+            column = np.asarray(tree[key])
+            if key in ('left', 'right'):
+                column = np.where(column >= 0, column + offset, -1)
+            parts[key].append(column)
+        offset += len(tree['feature'])
+    return CompiledForest.from_trees(*(np.concatenate(parts[key]) for key in parts), roots, **kwargs)
+
+
+def compile_sklearn_forest(model) -> CompiledForest:
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        leaf = tree.children_left < 0
+        trees.append({
+            'feature': np.where(leaf, -1, tree.feature),
+            'threshold': tree.threshold,
+            'left': tree.children_left,
+            'right': tree.children_right,
+            # missing_go_to_left exists from sklearn 1.3; older trees reject NaN input anyway
+            'default_left': getattr(tree, 'missing_go_to_left', np.zeros(n, dtype=np.uint8)).astype(bool),
+            'missing': np.full(n, MISSING_NAN),
+            'value': tree.value.reshape(n, -1)[:, 0],
+        })
+    return _assemble(trees, scale=1.0 / len(trees))
+
+
+def compile_xgboost(model) -> CompiledForest:
+    import json
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree' or int(learner['learner_model_param'].get('num_target', 1)) > 1:
+        raise ValueError("Only single-target gbtree XGBoost models can be compiled")
+    try:
+        n_trees = model.best_iteration + 1  # predict() stops at the best round too
+    except AttributeError:
+        n_trees = None
+    trees = []
+    for tree in gbm['model']['trees'][:n_trees]:
+        if any(tree['split_type']):
+            raise ValueError("Categorical XGBoost splits can't be compiled")
+        left = np.asarray(tree['left_children'])
+        trees.append({
+            'feature': np.where(left < 0, -1, tree['split_indices']),
+            # XGBoost evaluates splits in float32 and stores leaf values in split_conditions
+            'threshold': np.asarray(tree['split_conditions'], dtype=np.float32),
+            'left': left,
+            'right': tree['right_children'],
+            'default_left': np.asarray(tree['default_left'], dtype=bool),
+            'missing': np.full(len(left), MISSING_NAN),
+            'value': np.asarray(tree['split_conditions'], dtype=np.float32),
+        })
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    return _assemble(trees, strict=True, bias=base_score)
+
+
+def _lightgbm_tree(structure: Dict) -> Dict:
+    """Flatten one nested LightGBM tree_structure, parents before children (no recursion)"""
+    nodes, stack = [], [(structure, -1, False)]
+    tree = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'default_left', 'missing', 'value')}
+    missing_modes = {'None': MISSING_AS_ZERO, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+    while stack:
+        node, parent, is_left = stack.pop()
+        i = len(nodes)
+        nodes.append(node)
+        if parent >= 0:
+            tree['left' if is_left else 'right'][parent] = i
+        if 'leaf_value' in node:
+            for key, value in (('feature', -1), ('threshold', 0.0), ('default_left', False),
+                               ('missing', MISSING_NAN), ('value', node['leaf_value'])):
+                tree[key].append(value)
+        else:
+            if node['decision_type'] != '<=':
+                raise ValueError("Categorical LightGBM splits can't be compiled")
+            tree['feature'].append(node['split_feature'])
+            tree['threshold'].append(node['threshold'])
+            tree['default_left'].append(node['default_left'])
+            tree['missing'].append(missing_modes[node['missing_type']])
+            tree['value'].append(0.0)
+            stack.append((node['right_child'], i, False))
+            stack.append((node['left_child'], i, True))
+        tree['left'].append(-1)
+        tree['right'].append(-1)
+    tree['threshold'] = np.asarray(tree['threshold'], dtype=np.float64)
+    return tree
+
+
+def compile_lightgbm(model) -> CompiledForest:
+    dump = _lgb_booster(model).dump_model(num_iteration=_lgb_iterations(model))
+    if dump['num_tree_per_iteration'] != 1:
+        raise ValueError("Only single-output LightGBM models can be compiled")
+    # A single-leaf tree is a bare {'leaf_value': ...}; boost_from_average lives in tree 0
+    return _assemble(_lightgbm_tree(info['tree_structure']) for info in dump['tree_info'])
+
+
+def compile_model(name: str, model) -> CompiledForest:
+    """Array-of-nodes form of one ensemble member"""
+    compilers = {'rf': compile_sklearn_forest, 'xgb': compile_xgboost, 'lgb': compile_lightgbm}
+    return compilers[name](model)
+
+
+class EnsemblePredictor:
+    """
+    Ensemble loaded once and reused for every batch
+    `models` may be a lazy mapping (ml.artifacts): members are then only deserialized when the
+    native engine first needs them, and `forests` supplies saved node arrays for engine='numpy'
+    """
+
+    def __init__(self, models: Mapping[str, object], scaler=None, threads: Optional[Dict[str, int]] = None,
+                 forests: Optional[Mapping[str, CompiledForest]] = None):
+        self.models = models
+        self.names = list(models)
+        self.scaler = scaler
+        n_cpus = os.cpu_count() or 1
+        # Members run one after another, so each may use every core
+        self.threads = {name: (threads or {}).get(name, n_cpus) for name in self.names}
+        self._forests = forests
+        self._compiled = None
+
+    @classmethod
+    def load(cls, out_dir: Path = OUT_DIR, names: Iterable[str] = MODEL_NAMES, threads=None):
+        """Predictor over the saved model bundle; nothing is deserialized until first use"""
+        bundle = ModelBundle(out_dir)
+        names = list(names)
+        scaler = bundle.scaler if any(NEEDS_SCALING[name] for name in names) else None
+        return cls(bundle.models(names), scaler, threads, bundle.forests(names))
+
+    @property
+    def compiled(self) -> Dict[str, CompiledForest]:
+        """Array-of-nodes forests: the saved ones when available, else compiled on first use"""
+        if self._compiled is None:
+            forests = self._forests or {}
+            self._compiled = {name: forests[name] if name in forests else compile_model(name, self.models[name])
+                              for name in self.names}
+        return self._compiled
+
+    def _predict_native(self, name: str, model, X: np.ndarray) -> np.ndarray:
+        n_threads = 1 if len(X) < SINGLE_THREAD_ROWS else self.threads[name]
+        if name == 'xgb':
+            # inplace_predict reads the float32 array directly instead of building a DMatrix
+            booster = model.get_booster()
+            booster.set_param({'nthread': n_threads})
+            return booster.inplace_predict(X, iteration_range=_xgb_iterations(model))
+        if name == 'lgb':
+            return _lgb_booster(model).predict(X, num_iteration=_lgb_iterations(model), num_threads=n_threads)
+        model.n_jobs = n_threads
+        return model.predict(X)
+
+    def predict_members(self, X, engine: str = 'native') -> Dict[str, np.ndarray]:
+        """Per-model predictions for one batch"""
+        X_raw, X_scaled = self._inputs(X)
+        engine = self._engine(engine, len(X_raw))
+        return {name: self._predict_one(name, X_scaled if NEEDS_SCALING[name] else X_raw, engine)
+                for name in self.names}
+
+    def predict(self, X, engine: str = 'native', dedupe: bool = False) -> np.ndarray:
+        """
+        Average prediction of the ensemble members for one batch
+        dedupe scores each distinct feature row once, for what-if batches that repeat players
+        """
+        X_raw, X_scaled = self._inputs(X)
+        if not len(X_raw):
+            return np.zeros(0, dtype=np.float64)
+        inverse = None
+        if dedupe:
+            first, inverse = unique_rows(X_raw)
+            X_raw = X_raw[first]
+            X_scaled = X_scaled[first] if X_scaled is not None else None
+        engine = self._engine(engine, len(X_raw))
+        out = np.zeros(len(X_raw), dtype=np.float64)
+        for name in self.names:
+            out += self._predict_one(name, X_scaled if NEEDS_SCALING[name] else X_raw, engine)
+        out /= len(self.names)
+        return out if inverse is None else out[inverse]
+
+    @staticmethod
+    def _engine(engine: str, n_rows: int) -> str:
+        if engine == 'auto':
+            return 'numpy' if n_rows < AUTO_NUMPY_ROWS else 'native'
+        return engine
+
+    def _inputs(self, X):
+        X_raw = np.ascontiguousarray(X, dtype=np.float32)
+        scaled = any(NEEDS_SCALING[name] for name in self.models)
+        X_scaled = np.ascontiguousarray(self.scaler.transform(X_raw), dtype=np.float32) if scaled else None
+        return X_raw, X_scaled
+
+    def _predict_one(self, name, X, engine):
+        if engine == 'numpy':
+            return self.compiled[name].predict(X)
+        if engine != 'native':
+            raise ValueError(f"Unknown engine: {engine}")
+        return self._predict_native(name, self.models[name], X)
+
+
+def unique_rows(X: np.ndarray):
+    """(index of each distinct row's first occurrence, row -> distinct row) by raw bytes"""
+    rows = np.ascontiguousarray(X).view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def _lgb_booster(model):
+    """lightgbm.Booster of an LGBMRegressor, or the Booster itself (as loaded from a bundle)"""
+    return getattr(model, 'booster_', model)
+
+
+def _lgb_iterations(model):
+    """num_iteration matching LGBMRegressor.predict (None = every tree)"""
+    return getattr(model, 'best_iteration_', None) or None
+
+
+def _xgb_iterations(model):
+    """iteration_range matching XGBRegressor.predict (stops at the best round after early stopping)"""
+    try:
+        return 0, model.best_iteration + 1
+    except AttributeError:
+        return 0, 0
@@ -0,0 +1,96 @@
+"""
+Streaming JSON ingestion for large object payloads (e.g. the Sleeper players dump)
+Key/value pairs of the top-level object are decoded one at a time from byte chunks,
+so memory is bounded by the largest single value plus the rows the caller keeps
+"""
+import codecs
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+import pandas as pd
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+def iter_object_items(chunks: Iterable[bytes]) -> Iterator[Tuple[str, object]]:
+    """Yield (key, value) pairs of a top-level JSON object as the bytes arrive"""
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buf = buf[pos:] + utf8.decode(b'', final=True)
+        else:
+            buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def decode():
+        # A value is complete once something follows it; at least '}' always does
+        nonlocal pos
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    def expect(char):
+        nonlocal pos
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != char:
+            found = buf[pos:pos + 20] if pos < len(buf) else 'end of input'
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        pos += 1
+
+    expect('{')
+    skip_ws()
+    empty = pos < len(buf) and buf[pos] == '}'
+    while not empty:
+        skip_ws()
+        key = decode()
+        expect(':')
+        skip_ws()
+        yield key, decode()
+        skip_ws()
+        if pos < len(buf) and buf[pos] == ',':
+            pos += 1
+            continue
+        break
+    expect('}')
+    # Let the source run to completion (e.g. so a streaming cache write commits)
+    for _ in chunks:
+        pass
+
+
+class ColumnBuilder:
+    """Accumulates projected rows as per-column lists and builds a DataFrame once"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = {name: [] for name in columns}
+
+    def append(self, row: Dict):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), []))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
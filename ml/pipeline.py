@@ -0,0 +1,259 @@
+"""
+Training pipeline as explicit stages: load -> featurize -> train -> predict -> export
+Chained stages hand their outputs over in memory, so the models train just fitted score
+the players directly instead of being read back from disk. A stage run on its own takes
+its inputs from what earlier runs saved: features from the feature cache, models from the
+bundle, scores from scores.parquet. pipeline_state.json records the last completed stage
+for --resume. Every run leaves run_report.json (ml.telemetry spans per stage and fit) next
+to metrics.json
+
+Run with: python ml/train.py [--only export | --from predict | --resume] [--incremental] [--trace trace.json]
+"""
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.artifacts import ModelBundle
+from ml.delta import latest_batch
+from ml.export import export_top_players
+from ml.inference import EnsemblePredictor
+from ml.telemetry import span, write_chrome_trace, write_report
+from ml.train import (FEATURE_INPUT_COLUMNS, INCREMENTAL_MIN_ROWS, MODEL_NAMES, OUT_DIR, PIPELINE_COLUMNS,
+                      PIPELINE_STAGES, SCORES_PATH, load_data, load_features, model_params, parse_args,
+                      rescore_changed, save_scores, store_source, train_and_eval, update_models)
+from ml.watermark import load_watermark, new_row_mask, row_keys, save_watermark
+
+STATE_PATH = OUT_DIR / 'pipeline_state.json'
+REPORT_PATH = OUT_DIR / 'run_report.json'
+
+
+def resume_predictor(run) -> EnsemblePredictor:
+    if not ModelBundle(OUT_DIR).has(MODEL_NAMES):
+        raise RuntimeError("No saved models to resume from, run the train stage first")
+    return EnsemblePredictor.load(OUT_DIR)
+
+
+def resume_scores(run) -> np.ndarray:
+    """Saved scores in the order of the loaded players"""
+    if not SCORES_PATH.exists():
+        raise RuntimeError("No saved scores to resume from, run the predict stage first")
+    saved = pd.read_parquet(SCORES_PATH).set_index('player_id')['score']
+    scores = saved.reindex(run['df']['player_id'].astype('string')).to_numpy(dtype=float)
+    if np.isnan(scores).any():
+        raise RuntimeError("Saved scores miss players in the current input, run the predict stage first")
+    return scores
+
+
+# How each stage output is recovered when the stage that makes it did not run in this process
+RESUME = {
+    'df': lambda run: load_data(PIPELINE_COLUMNS),
+    'features': lambda run: load_features(run['df']),
+    'predictor': resume_predictor,
+    'scores': resume_scores,
+}
+
+
+class PipelineRun:
+    """
+    Outputs of the stages run so far; a missing one is resumed from saved artifacts
+    Stage functions return the number of rows they processed, for the run report
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.outputs = {}
+        self.rmses = None
+
+    def __getitem__(self, key: str):
+        if key not in self.outputs:
+            self.outputs[key] = RESUME[key](self)
+        return self.outputs[key]
+
+    def __setitem__(self, key: str, value):
+        self.outputs[key] = value
+
+
+def stage_load(run: PipelineRun):
+    print("🏈 Loading NFL player data...")
+    run['df'] = load_data(PIPELINE_COLUMNS)
+    print(f"✅ Loaded {len(run['df'])} players")
+    return len(run['df'])
+
+
+def stage_featurize(run: PipelineRun):
+    print("🔧 Creating features...")
+    X, y = load_features(run['df'])
+    run['features'] = X, y
+    print(f"✅ Created {X.shape[1]} features for {len(X)} players")
+    return len(X)
+
+
+def stage_train(run: PipelineRun):
+    args = run.args
+    X, y = run['features']
+
+    # --incremental continues the saved models on new or changed rows when only a few changed
+    keys = row_keys(run['df'], FEATURE_INPUT_COLUMNS)
+    watermark = load_watermark(OUT_DIR) if args.incremental else None
+    have_models = ModelBundle(OUT_DIR).has(MODEL_NAMES)
+    params = {name: model_params(name) for name in MODEL_NAMES}
+    mode, n_new = 'full', len(X)
+    # New tuned params invalidate the saved models, so they force a full retrain
+    if watermark is not None and have_models and watermark['features'] == list(X.columns) \
+            and watermark.get('params') == params:
+        new_rows = new_row_mask(keys, watermark)
+        n_new = int(new_rows.sum())
+        if not n_new:
+            mode = 'unchanged'
+        elif n_new < INCREMENTAL_MIN_ROWS:
+            print(f"🔁 Only {n_new} new rows, a full retrain is cheaper than an update")
+        elif n_new <= args.full_retrain_ratio * watermark['rows']:
+            mode = 'incremental'
+
+    if mode == 'incremental':
+        print(f"🤖 Incremental retrain on {n_new} new rows...")
+        updated = update_models(X, y, new_rows, workers=args.workers)
+        if updated is None:
+            print("🔁 Falling back to a full retrain")
+            mode = 'full'
+        else:
+            run['predictor'] = EnsemblePredictor(*updated)
+    if mode == 'full':
+        print("🤖 Training ensemble models...")
+        run.rmses, models, scaler = train_and_eval(X, y, workers=args.workers)
+
+        print("📊 Saving metrics...")
+        with open(OUT_DIR / 'metrics.json', 'w', encoding='utf-8') as f:
+            json.dump(run.rmses, f, indent=2)
+        run['predictor'] = EnsemblePredictor(models, scaler)
+    elif mode == 'unchanged':
+        # The predict stage resumes the saved models
+        print("✅ No new rows since last run, keeping current models")
+    # The watermark keeps only the current rows, so superseded versions don't pile up
+    save_watermark(OUT_DIR, keys, X.columns, mode, n_new, params)
+    return n_new
+
+
+def stage_predict(run: PipelineRun):
+    if run.args.delta:
+        rescored = rescore_changed(run['df'])
+        if rescored is not None:
+            scores, changelog_until, n_changed = rescored
+            print(f"🔁 Rescored {n_changed} changed players")
+            save_scores(run['df'], scores, changelog_until)
+            run['scores'] = scores
+            return n_changed
+        print("⚠️  No saved scores to patch yet, running the full pipeline")
+        stage_featurize(run)
+        stage_train(run)
+
+    print("🎯 Generating predictions...")
+    X, _ = run['features']
+    scores = run['predictor'].predict(X)
+    save_scores(run['df'], scores, latest_batch(store_source()))
+    run['scores'] = scores
+    return len(scores)
+
+
+def stage_export(run: PipelineRun):
+    args = run.args
+    # Build enhanced stats in one vectorized pass and keep the top K for the app
+    output_players = export_top_players(run['df'], run['scores'], k=args.top_k,
+                                        tie_break=args.tie_break, quotas=args.quotas)
+
+    # Save predictions for the web app
+    with open(OUT_DIR / 'predictions.json', 'w', encoding='utf-8') as f:
+        json.dump(output_players, f, indent=2)
+
+    # Also update the main data.json file for the web app
+    with open(ROOT / 'data.json', 'w', encoding='utf-8') as f:
+        json.dump(output_players, f, indent=2)
+
+    print(f"🎯 Generated predictions for top {len(output_players)} players")
+    print(f"💾 Updated data.json for web app")
+    print(f"\n🏆 Top 10 Players:")
+    for i, player in enumerate(output_players[:10]):
+        print(f"  {i+1:2d}. {player['name']:<20} {player['pos']:<3} {player['team']:<3} {player['score']:.1f}")
+    return len(output_players)
+
+
+STAGES = {
+    'load': stage_load,
+    'featurize': stage_featurize,
+    'train': stage_train,
+    'predict': stage_predict,
+    'export': stage_export,
+}
+
+
+def load_state() -> Dict:
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(completed: str):
+    state = {'completed': completed, 'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+    with open(STATE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def select_stages(args) -> List[str]:
+    """Stages this invocation runs, in order"""
+    if getattr(args, 'only', None):
+        return [args.only]
+    start = getattr(args, 'from_stage', None) or PIPELINE_STAGES[0]
+    if getattr(args, 'resume', False):
+        completed = load_state().get('completed')
+        if completed == PIPELINE_STAGES[-1]:
+            return []
+        start = PIPELINE_STAGES[PIPELINE_STAGES.index(completed) + 1] if completed in STAGES else start
+    stages = list(PIPELINE_STAGES[PIPELINE_STAGES.index(start):])
+    if args.delta:
+        # A delta run rescores with the current models; predict falls back to both if it can't
+        stages = [stage for stage in stages if stage not in ('featurize', 'train')]
+    return stages
+
+
+def run_pipeline(args) -> PipelineRun:
+    stages = select_stages(args)
+    if not stages:
+        print("✅ Last run completed every stage, nothing to resume")
+    if stages[:1] == [PIPELINE_STAGES[0]]:
+        # A fresh run: a failure before its first stage completes must not resume an older run
+        STATE_PATH.unlink(missing_ok=True)
+    run = PipelineRun(args)
+    completed = []
+    try:
+        for stage in stages:
+            with span(stage) as handle:
+                handle.rows = STAGES[stage](run)
+            save_state(stage)
+            completed.append(stage)
+    finally:
+        # Written for failed runs too: the report shows how far the run got and what it cost
+        write_report(REPORT_PATH, stages=stages, completed=completed,
+                     status='ok' if completed == stages else 'failed')
+        if getattr(args, 'trace', None):
+            write_chrome_trace(args.trace)
+
+    if stages and stages[-1] == PIPELINE_STAGES[-1]:
+        print(f"✅ {'Training' if 'train' in stages else 'Pipeline'} complete!")
+        if run.rmses is not None:
+            print(f"📈 Model RMSEs: {run.rmses}")
+    return run
+
+
+if __name__ == '__main__':
+    run_pipeline(parse_args())
@@ -0,0 +1,90 @@
+"""
+Declared schema for the player table, shared by the fetchers and train.load_data()
+Low-cardinality strings become categoricals and numerics use the smallest type that fits
+"""
+import hashlib
+import inspect
+import json
+from pathlib import Path
+import pandas as pd
+
+# Columns not listed here (ids, names, height strings) keep pandas' default string dtype
+PLAYER_SCHEMA = {
+    'position': 'category',
+    'team': 'category',
+    'jersey_number': 'Int8',
+    'weight': 'Int16',
+    'age': 'Int8',
+    'college': 'category',
+    'rookie_year': 'Int16',
+    'years_exp': 'Int8',
+    'fantasy_positions': 'category',
+    'injury_status': 'category',
+    'depth_chart_position': 'category',
+    'depth_chart_order': 'float32',
+    'active': 'boolean',
+    'source': 'category',
+}
+
+# Inclusive valid ranges, checked before downcasting
+PLAYER_BOUNDS = {
+    'jersey_number': (0, 99),
+    'weight': (0, 400),
+    'age': (0, 60),
+    'rookie_year': (0, 2100),
+    'years_exp': (0, 30),
+    'depth_chart_order': (0, 99),
+}
+
+# Columns featurize() and the export stage cannot do without
+REQUIRED_COLUMNS = ('name', 'position', 'team', 'age', 'years_exp', 'weight', 'depth_chart_order')
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Validate and cast the schema columns present in df; other columns are left as-is"""
+    converted = {}
+    problems = []
+    for col, dtype in PLAYER_SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == 'category':
+            converted[col] = df[col].astype('category')
+            continue
+        if dtype == 'boolean':
+            converted[col] = df[col].astype('boolean')
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        low, high = PLAYER_BOUNDS.get(col, (None, None))
+        if low is not None:
+            bad = (values < low) | (values > high)
+            if bad.any():
+                problems.append(f"{col}: {int(bad.sum())} values outside [{low}, {high}]")
+                continue
+        if dtype.startswith('Int'):
+            values = values.round()
+        converted[col] = values.astype(dtype)
+    if problems:
+        raise ValueError(f"Player table failed schema validation: {'; '.join(problems)}")
+    return df.assign(**converted) if converted else df
+
+
+def read_players(path: Path, columns=None) -> pd.DataFrame:
+    """Read a player CSV with explicit dtypes, optionally only some columns"""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in header and (columns is None or c in columns)]
+    if missing:
+        raise ValueError(f"Player table {path} is missing required columns: {missing}")
+    # Numerics are parsed straight to float32 and downcast by apply_schema after validation
+    dtype = {c: 'category' if PLAYER_SCHEMA[c] == 'category' else 'float32'
+             for c in usecols if c in PLAYER_SCHEMA and PLAYER_SCHEMA[c] != 'boolean'}
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype)
+    return apply_schema(df)
+
+
+def schema_version() -> str:
+    """Hash of the declared dtypes and bounds and of the code applying them (part of the feature cache key)"""
+    h = hashlib.sha256(json.dumps([PLAYER_SCHEMA, PLAYER_BOUNDS], sort_keys=True).encode('utf-8'))
+    for fn in (apply_schema, read_players):
+        h.update(inspect.getsource(fn).encode('utf-8'))
+    return h.hexdigest()[:16]
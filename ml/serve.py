@@ -0,0 +1,373 @@
+"""
+Local scoring service for the draft UI
+Loads the ensemble and the player table once, then re-scores players on demand, e.g. after
+a depth-chart change, without rerunning the pipeline. Concurrent requests are coalesced
+by a micro-batcher into one featurize + predict call
+
+Run with: python -m ml.serve [--port 8001 --max-batch 512 --max-wait-ms 2]
+
+  GET  /health      models and players loaded
+  GET  /stats       request count and p50/p99 latency per endpoint, mean batch size
+  POST /score       {"player_id": "4046", "depth_chart_order": 2}  -> one score
+  POST /score/bulk  {"players": [{"player_id": ...}, ...]}           -> scores in order
+  POST /reload      reload models and players after a training run
+"""
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.inference import EnsemblePredictor
+from ml.features import FEATURE_INPUT_COLUMNS, OUT_DIR, build_features, load_data
+
+NUMERIC_INPUTS = [c for c in FEATURE_INPUT_COLUMNS if c != 'position']
+# Fields a request may override; injury_status is echoed back but is not a model input
+OVERRIDABLE = set(FEATURE_INPUT_COLUMNS) | {'injury_status'}
+MAX_BULK = 10_000
+LATENCY_WINDOW = 10_000  # most recent requests kept per endpoint for percentiles
+
+
+class RequestError(ValueError):
+    """Bad request payload, reported to the client as HTTP 400/404"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_override(col: str, value):
+    """Checked override value: a finite number for numeric inputs, a string otherwise"""
+    if col in NUMERIC_INPUTS:
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise RequestError(f"{col} must be a number, got {value!r}")
+        try:
+            number = float(value)
+        except ValueError:
+            raise RequestError(f"{col} must be a number, got {value!r}")
+        if not np.isfinite(number):
+            raise RequestError(f"{col} must be finite, got {value!r}")
+        return number
+    if col == 'position':
+        if not isinstance(value, str) or not value.strip():
+            raise RequestError(f"position must be a non-empty string, got {value!r}")
+        return value.strip().upper()
+    if value is not None and not isinstance(value, str):
+        raise RequestError(f"{col} must be a string, got {value!r}")
+    return value
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring calls: the first waiting item opens a batch that closes at
+    max_batch rows or max_wait seconds later, then one score_fn call serves all of them
+    """
+
+    def __init__(self, score_fn, max_batch: int = 512, max_wait: float = 0.002):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_rows = deque(maxlen=LATENCY_WINDOW)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List) -> Future:
+        future = Future()
+        self._queue.put((items, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch, rows = [first], len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            try:
+                nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if nxt is None:
+                self._queue.put(None)  # finish this batch, stop on the next pass
+                break
+            batch.append(nxt)
+            rows += len(nxt[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            items = [item for part, _ in batch for item in part]
+            self.batch_rows.append(len(items))
+            try:
+                scores = self.score_fn(items)
+            except Exception as exc:
+                self._score_separately(batch, exc)
+                continue
+            start = 0
+            for part, future in batch:
+                future.set_result(scores[start:start + len(part)])
+                start += len(part)
+
+    def _score_separately(self, batch, exc: Exception):
+        """After a failed batch, score each request on its own so one bad item fails only its caller"""
+        if len(batch) == 1:
+            batch[0][1].set_exception(exc)
+            return
+        for part, future in batch:
+            try:
+                future.set_result(self.score_fn(part))
+            except Exception as part_exc:
+                future.set_exception(part_exc)
+
+
+class LatencyStats:
+    """Recent request latencies per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            snapshot = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts = dict(self._counts)
+        return {endpoint: {'requests': counts[endpoint],
+                           'p50_ms': round(float(np.percentile(values, 50)) * 1000, 3),
+                           'p99_ms': round(float(np.percentile(values, 99)) * 1000, 3)}
+                for endpoint, values in snapshot.items()}
+
+
+class ScoringService:
+    """Warm ensemble + player table behind the micro-batcher"""
+
+    def __init__(self, out_dir: Path = OUT_DIR, max_batch: int = 512, max_wait: float = 0.002,
+                 engine: str = 'auto'):
+        self.out_dir = out_dir
+        self.engine = engine
+        self.stats = LatencyStats()
+        self.reload()
+        self.batcher = MicroBatcher(self.score_items, max_batch, max_wait)
+
+    def reload(self):
+        players = load_data(['player_id', *FEATURE_INPUT_COLUMNS])
+        players = players.drop_duplicates('player_id', keep='last')
+        # Plain-typed inputs (overrides are written into copies) and every player's base features
+        inputs = pd.DataFrame({
+            'position': players['position'].astype(object).to_numpy(),
+            **{col: pd.to_numeric(players[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+               for col in NUMERIC_INPUTS},
+        }, index=pd.Index(players['player_id'].astype(str), name='player_id'))
+        features = np.ascontiguousarray(build_features(inputs), dtype=np.float32)
+        predictor = EnsemblePredictor.load(self.out_dir)
+        # Deserialize whatever the engine will touch now, not on the first request
+        if self.engine != 'native':
+            predictor.compiled
+        if self.engine != 'numpy':
+            for name in predictor.names:
+                predictor.models[name]
+        # One assignment, so in-flight batches see either the old or the new state, never a mix
+        self._state = (inputs, features, predictor)
+
+    @property
+    def players(self) -> pd.DataFrame:
+        return self._state[0]
+
+    @property
+    def predictor(self) -> EnsemblePredictor:
+        return self._state[2]
+
+    def parse_item(self, spec) -> Tuple[str, Dict]:
+        """(player_id, feature overrides) from one request object"""
+        if not isinstance(spec, dict) or 'player_id' not in spec:
+            raise RequestError("each player needs a player_id")
+        player_id = str(spec['player_id'])
+        overrides = {k: v for k, v in spec.items() if k != 'player_id'}
+        unknown = set(overrides) - OVERRIDABLE
+        if unknown:
+            raise RequestError(f"can't override {sorted(unknown)}; allowed: {sorted(OVERRIDABLE)}")
+        if player_id not in self.players.index:
+            raise RequestError(f"unknown player_id {player_id!r}", status=404)
+        return player_id, {col: parse_override(col, value) for col, value in overrides.items()}
+
+    def score_items(self, items: List[Tuple[str, Dict]]) -> np.ndarray:
+        """
+        One predict pass over a whole batch of (player_id, overrides)
+        Rows without feature overrides reuse the base features; the rest are featurized together
+        """
+        inputs, features, predictor = self._state
+        rows = inputs.index.get_indexer([player_id for player_id, _ in items])
+        if (rows < 0).any():
+            # Dropped by a /reload after parse_item checked it; -1 would index the last player
+            missing = sorted({items[i][0] for i in np.flatnonzero(rows < 0)})
+            raise RequestError(f"unknown player_id {', '.join(map(repr, missing))}", status=404)
+        X = features[rows]
+        changed = [i for i, (_, overrides) in enumerate(items) if set(overrides) & set(FEATURE_INPUT_COLUMNS)]
+        if changed:
+            frame = inputs.iloc[rows[changed]].reset_index(drop=True)
+            for j, i in enumerate(changed):
+                for col, value in items[i][1].items():
+                    if col in NUMERIC_INPUTS or col == 'position':
+                        frame.iat[j, frame.columns.get_loc(col)] = value
+            X[changed] = build_features(frame).to_numpy(dtype=np.float32)
+        return predictor.predict(X, engine=self.engine)
+
+    def score(self, specs: List) -> List[Dict]:
+        items = [self.parse_item(spec) for spec in specs]
+        scores = self.batcher.submit(items).result() if items else []
+        results = []
+        for (player_id, overrides), score in zip(items, scores):
+            result = {'player_id': player_id, 'score': round(float(score), 3)}
+            if 'injury_status' in overrides:
+                result['injury_status'] = overrides['injury_status']
+            results.append(result)
+        return results
+
+    def health(self) -> Dict:
+        return {'status': 'ok', 'models': self.predictor.names, 'players': len(self.players)}
+
+    def report(self) -> Dict:
+        batches = list(self.batcher.batch_rows)
+        return {'endpoints': self.stats.summary(), 'batches': len(batches),
+                'mean_batch_rows': round(float(np.mean(batches)), 2) if batches else 0.0}
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive: the UI reuses one connection per burst
+    # Headers and body go out as two writes; with Nagle on, the body waits ~40ms for the ACK
+    disable_nagle_algorithm = True
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise RequestError("body is not valid JSON")
+
+    def _dispatch(self, routes):
+        service = self.server.service
+        start = time.perf_counter()
+        route = self.path.split('?', 1)[0]
+        try:
+            # POST bodies are always consumed, so a rejected request can't desync keep-alive
+            body = self._read_json() if self.command == 'POST' else None
+            handler = routes.get(route)
+            if handler is None:
+                raise RequestError(f"no route {self.command} {route}", status=404)
+            payload, status = handler(service, body), 200
+        except RequestError as exc:
+            payload, status = {'error': str(exc)}, exc.status
+        except Exception as exc:
+            payload, status = {'error': f"{type(exc).__name__}: {exc}"}, 500
+        self._send_json(payload, status)
+        service.stats.record(f"{self.command} {route}", time.perf_counter() - start)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self._dispatch({'/health': lambda s, _: s.health(), '/stats': lambda s, _: s.report()})
+
+    def do_POST(self):
+        self._dispatch({'/score': score_one, '/score/bulk': score_bulk, '/reload': reload})
+
+    def log_message(self, format, *args):
+        pass  # per-request lines would dominate the console; /stats has the numbers
+
+
+def score_one(service: ScoringService, body) -> Dict:
+    return service.score([body])[0]
+
+
+def score_bulk(service: ScoringService, body) -> Dict:
+    players = body.get('players') if isinstance(body, dict) else None
+    if not isinstance(players, list):
+        raise RequestError('expected {"players": [...]}')
+    if len(players) > MAX_BULK:
+        raise RequestError(f"at most {MAX_BULK} players per request")
+    return {'scores': service.score(players)}
+
+
+def reload(service: ScoringService, body) -> Dict:
+    service.reload()
+    return service.health()
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8001, **service_kwargs) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    server.service = ScoringService(**service_kwargs)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve ensemble re-scores over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--max-batch', type=int, default=512, help='rows per micro-batch (1 disables batching)')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='how long a batch stays open for more requests (default: 2ms)')
+    parser.add_argument('--engine', choices=['auto', 'native', 'numpy'], default='auto',
+                        help='auto walks NumPy node arrays for small batches, the model libraries otherwise')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000,
+                         engine=args.engine)
+    service = server.service
+    print(f"🚀 Scoring {len(service.players)} players with {', '.join(service.predictor.names)} "
+          f"on http://{args.host}:{server.server_address[1]}")
+    # SIGTERM (process managers, background jobs) shuts down like Ctrl-C and still reports
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.batcher.close()
+        print(f"📊 {json.dumps(service.report())}")
+
+
+if __name__ == '__main__':
+    main()
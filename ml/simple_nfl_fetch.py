@@ -2,13 +2,29 @@
 Simple working script to get NFL players from Sleeper API
 Sleeper is the most reliable free source for NFL player data
 """
+import sys
 import requests
-import pandas as pd
 import json
 from pathlib import Path
 
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def get_all_nfl_players_sleeper():
+from ml.delta import record_changes, summarize
+from ml.fetch_engine import get_engine
+from ml.json_stream import ColumnBuilder, iter_object_items
+from ml.schema import apply_schema
+from ml.storage import write_partition
+
+PLAYER_COLUMNS = [
+    'player_id', 'name', 'first_name', 'last_name', 'position', 'team', 'jersey_number',
+    'height', 'weight', 'age', 'college', 'rookie_year', 'years_exp', 'fantasy_positions',
+    'injury_status', 'depth_chart_position', 'depth_chart_order', 'active',
+]
+
+
+def get_all_nfl_players_sleeper(season: int = 2024, week: int = 0):
     """
     Get all active NFL players from Sleeper API
     This is the most reliable free source
@@ -17,19 +33,13 @@ def get_all_nfl_players_sleeper():
     
     try:
         url = "https://api.sleeper.app/v1/players/nfl"
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; FantasyDraftBot/1.0)'}
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
         
-        print("✅ Successfully fetched player data")
-        players_dict = response.json()
-        
-        # Convert to list of active players
-        players = []
+        # Parse the dump as it streams (from the on-disk cache when fresh) and keep
+        # only active players, straight into columns
+        players = ColumnBuilder(PLAYER_COLUMNS)
         active_count = 0
         
-        for player_id, data in players_dict.items():
+        for player_id, data in iter_object_items(get_engine().stream(url, timeout=30)):
             # Only include active players
             if not data.get('active', False):
                 continue
@@ -66,21 +76,29 @@ def get_all_nfl_players_sleeper():
             }
             players.append(player)
         
+        print("✅ Successfully fetched player data")
         print(f"✅ Processed {active_count} active players")
         
         # Convert to DataFrame
-        df = pd.DataFrame(players)
+        df = players.to_frame()
         
         # Clean and filter
         df = df[df['position'].isin(['QB', 'RB', 'WR', 'TE', 'K', 'DEF'])].copy()
         df = df.sort_values(['team', 'position', 'name']).reset_index(drop=True)
+        df = apply_schema(df)
+        
+        # Log what changed since the last stored snapshot
+        changes = record_changes(df, 'sleeper')
+        if len(changes):
+            print(f"🔁 Changes since last pull: {summarize(changes)}")
         
-        # Save files
+        # Save to the columnar store, plus CSV/JSON exports
+        partition = write_partition(df, 'sleeper', season, week)
         Path('data').mkdir(exist_ok=True)
         df.to_csv('data/nfl_players_sleeper.csv', index=False)
         df.to_json('data/nfl_players_sleeper.json', orient='records')
         
-        print(f"💾 Saved {len(df)} fantasy-relevant players to data/")
+        print(f"💾 Saved {len(df)} fantasy-relevant players to {partition} (exports in data/)")
         
         # Print summary
         print(f"\n📊 Player Summary:")
@@ -0,0 +1,114 @@
+"""
+Columnar player store: Parquet files partitioned by source/season/week
+Layout: data/store/source=<source>/season=<season>/week=<week>/players.parquet
+CSV/JSON remain export formats; the pipeline reads back from here. The weekly source holds
+player-week stat rows (ml.history) instead of the player table
+
+Import with: python -m ml.storage players.csv [--source sleeper --season 2024 --week 0]
+             python -m ml.storage week.csv --source weekly --season 2024 --week 3
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.schema import REQUIRED_COLUMNS, apply_schema, read_players
+
+STORE_DIR = ROOT / 'data' / 'store'
+PARTITION_FILE = 'players.parquet'
+_PARTITION_RE = re.compile(r'season=(\d+)[/\\]week=(\d+)')
+
+WEEKLY_SOURCE = 'weekly'
+# Columns a weekly stat file cannot do without (the other counting stats default to 0)
+WEEKLY_REQUIRED_COLUMNS = ('player_id', 'team', 'fantasy_points')
+WEEKLY_STAT_COLUMNS = ('fantasy_points', 'targets', 'carries')
+
+
+def partition_path(source: str, season: int, week: int = 0, store_dir: Path = STORE_DIR) -> Path:
+    """Path of one source/season/week partition"""
+    return store_dir / f'source={source}' / f'season={season}' / f'week={week}' / PARTITION_FILE
+
+
+def write_partition(df: pd.DataFrame, source: str, season: int, week: int = 0,
+                    store_dir: Path = STORE_DIR) -> Path:
+    """Write (replace) one partition atomically"""
+    path = partition_path(source, season, week, store_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def list_partitions(source: str, store_dir: Path = STORE_DIR):
+    """(season, week, path) for every partition of a source, oldest first"""
+    partitions = []
+    for path in (store_dir / f'source={source}').glob(f'season=*/week=*/{PARTITION_FILE}'):
+        match = _PARTITION_RE.search(str(path))
+        if match:
+            partitions.append((int(match.group(1)), int(match.group(2)), path))
+    return sorted(partitions)
+
+
+def latest_partition(source: str, store_dir: Path = STORE_DIR):
+    """Path of the most recent season/week partition of a source, or None"""
+    partitions = list_partitions(source, store_dir)
+    return partitions[-1][2] if partitions else None
+
+
+def read_partition(path: Path, columns=None) -> pd.DataFrame:
+    """Read one partition, loading only the requested columns"""
+    if columns is not None:
+        available = _schema_columns(path)
+        missing = [c for c in REQUIRED_COLUMNS if c in columns and c not in available]
+        if missing:
+            raise ValueError(f"Player partition {path} is missing required columns: {missing}")
+        columns = [c for c in columns if c in available]
+    return apply_schema(pd.read_parquet(path, columns=columns))
+
+
+def _schema_columns(path: Path) -> set:
+    """Column names stored in a Parquet file, read from its footer"""
+    import pyarrow.parquet as pq
+    return set(pq.read_schema(path).names)
+
+
+def read_weekly_stats(path: Path) -> pd.DataFrame:
+    """Read a player-week stat CSV: ids as strings, counting stats as float32"""
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in WEEKLY_REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Weekly stat file {path} is missing required columns: {missing}")
+    df = pd.read_csv(path, dtype={'player_id': 'string', 'team': 'category'})
+    bad = {}
+    for col in WEEKLY_STAT_COLUMNS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce')
+            if (values.isna() & df[col].notna()).any():
+                bad[col] = int((values.isna() & df[col].notna()).sum())
+            df[col] = values.astype('float32')
+    if bad:
+        raise ValueError(f"Weekly stat file {path} has non-numeric stats: {bad}")
+    return apply_schema(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import a player or weekly stat CSV into the columnar store')
+    parser.add_argument('csv', type=Path)
+    parser.add_argument('--source', default='sleeper')
+    parser.add_argument('--season', type=int, default=2024)
+    parser.add_argument('--week', type=int, default=0)
+    args = parser.parse_args()
+    read = read_weekly_stats if args.source == WEEKLY_SOURCE else read_players
+    path = write_partition(read(args.csv), args.source, args.season, args.week)
+    print(f"💾 Imported {args.csv} -> {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Run telemetry: wall time, CPU time, peak RSS, rows/s and bytes read/written per span
+  with span('featurize') as s: ...; s.rows = len(X)     context manager
+  @traced('clean', rows=len)                            decorator, rows taken from the result
+Spans nest and are kept in order of completion. write_report() writes them as a JSON run
+report with totals per parent/name; write_chrome_trace() writes the same spans for chrome://tracing
+or Perfetto. CPU time, peak RSS and bytes are per process (bytes come from /proc/self/io, so
+they are None off Linux): work that runs in joblib workers is wrapped with collected(), which
+records it in the worker and hands the spans back to be merged into the parent's run
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _io_counters():
+    """(bytes read, bytes written) by this process so far, or None where /proc is missing"""
+    try:
+        with open('/proc/self/io', 'r', encoding='ascii') as f:
+            fields = dict(line.split(':') for line in f)
+    except OSError:
+        return None
+    return int(fields['rchar']), int(fields['wchar'])
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+class Span:
+    """Handle yielded by span(): set rows (or attrs) before the block ends"""
+
+    def __init__(self, name: str, rows: Optional[int], attrs: Dict):
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+
+
+class Recorder:
+    """Completed spans of one process (or of one collected worker job)"""
+
+    def __init__(self):
+        self.spans: List[Dict] = []
+        self.started_at = time.time()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, rows: Optional[int] = None, **attrs):
+        stack = self._stack()
+        parent = stack[-1].name if stack else None
+        handle = Span(name, rows, attrs)
+        start, wall0, cpu0, io0 = time.time(), time.perf_counter(), time.process_time(), _io_counters()
+        stack.append(handle)
+        try:
+            yield handle
+        finally:
+            stack.pop()
+            wall = time.perf_counter() - wall0
+            io1 = _io_counters() if io0 is not None else None
+            self.spans.append({
+                'name': name,
+                'parent': parent,
+                'depth': len(stack),
+                'start': start,
+                'wall_s': wall,
+                'cpu_s': time.process_time() - cpu0,
+                'rows': handle.rows,
+                'rows_per_s': handle.rows / wall if handle.rows is not None and wall > 0 else None,
+                'bytes_read': io1[0] - io0[0] if io1 else None,
+                'bytes_written': io1[1] - io0[1] if io1 else None,
+                'peak_rss_mb': _peak_rss_mb(),
+                'pid': os.getpid(),
+                'tid': threading.get_native_id(),
+                'attrs': handle.attrs,
+            })
+
+    def merge(self, spans: List[Dict], **attrs):
+        """Adopt spans recorded elsewhere (a worker job) under the current span"""
+        stack = self._stack()
+        for record in spans:
+            if record['parent'] is None and stack:
+                record = dict(record, parent=stack[-1].name)
+            record = dict(record, depth=record['depth'] + len(stack), attrs={**attrs, **record['attrs']})
+            self.spans.append(record)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per parent/name: count, wall/CPU seconds and rows, in order of first completion"""
+        totals = {}
+        for record in self.spans:
+            key = f"{record['parent']}/{record['name']}" if record['parent'] else record['name']
+            total = totals.setdefault(key, {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': 0})
+            total['count'] += 1
+            total['wall_s'] += record['wall_s']
+            total['cpu_s'] += record['cpu_s']
+            total['rows'] += record['rows'] or 0
+        return totals
+
+    def report(self, **extra) -> Dict:
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec='seconds'),
+            'wall_s': time.perf_counter() - self._wall0,
+            'cpu_s': time.process_time() - self._cpu0,
+            'peak_rss_mb': _peak_rss_mb(),
+            'argv': sys.argv,
+            **extra,
+            'summary': self.summary(),
+            'spans': self.spans,
+        }
+
+
+_recorder = Recorder()
+
+
+def recorder() -> Recorder:
+    return _recorder
+
+
+def span(name: str, rows: Optional[int] = None, **attrs):
+    """Record the enclosed block as one span of the current run"""
+    return _recorder.span(name, rows, **attrs)
+
+
+def traced(name: Optional[str] = None, rows: Optional[Callable] = None):
+    """Decorator form of span(); rows(result) gives the span's row count"""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name or fn.__name__) as handle:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    handle.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def collected(fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs) on a fresh recorder; returns (result, its spans)
+    For joblib jobs: a worker process's spans would otherwise never reach the run report
+    """
+    global _recorder
+    outer, _recorder = _recorder, Recorder()
+    try:
+        result = fn(*args, **kwargs)
+        return result, _recorder.spans
+    finally:
+        _recorder = outer
+
+
+def write_report(path: Path, **extra) -> Dict:
+    """JSON run report of every span recorded in this process so far"""
+    report = _recorder.report(**extra)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def write_chrome_trace(path: Path):
+    """Spans as Chrome trace complete events (one lane per process/thread)"""
+    spans = _recorder.spans
+    origin = min((record['start'] for record in spans), default=0.0)
+    events = [{
+        'name': record['name'],
+        'cat': record['parent'] or 'run',
+        'ph': 'X',
+        'ts': (record['start'] - origin) * 1e6,
+        'dur': record['wall_s'] * 1e6,
+        'pid': record['pid'],
+        'tid': record['tid'],
+        'args': {key: record[key] for key in ('cpu_s', 'rows', 'rows_per_s', 'bytes_read',
+                                               'bytes_written', 'peak_rss_mb')} | record['attrs'],
+    } for record in spans]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
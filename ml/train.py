@@ -1,299 +1,343 @@
+import argparse
 import json
 import os
+import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
-from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_squared_error
-from sklearn.preprocessing import StandardScaler
-from joblib import dump
+from joblib import Parallel, delayed
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA_IN = ROOT / 'data' / 'nfl_players_sleeper.csv'
-OUT_DIR = ROOT / 'ml_output'
-OUT_DIR.mkdir(exist_ok=True)
+if __package__ in (None, ''):
+    # Allow running as `python ml/train.py` as well as `python -m ml.train`
+    sys.path.insert(0, str(ROOT))
 
+from ml.artifacts import ModelBundle, save_bundle
+from ml.delta import affected_players, read_changelog
+from ml.export import EXPORT_INPUT_COLUMNS
+from ml.feature_store import cached_features
+from ml.features import (FEATURE_INPUT_COLUMNS, MODEL_NAMES, NEEDS_SCALING, OUT_DIR, build_features,
+                         data_source, featurize, load_data, store_source)
+from ml.fold_cache import FoldCache
+from ml.schema import schema_version
+from ml.telemetry import collected, recorder, span
+from ml.validation import chain_folds, run_chain, static_folds
 
-def load_data():
-    """Load real NFL player data from Sleeper API"""
-    if DATA_IN.exists():
-        df = pd.read_csv(DATA_IN)
-        print(f"Loaded {len(df)} players from Sleeper data")
-        return df
+FEATURE_CACHE = ROOT / 'data' / 'features'
+SCORES_PATH = OUT_DIR / 'scores.parquet'
+
+# Player columns read by the whole pipeline
+PIPELINE_COLUMNS = list(dict.fromkeys(['player_id', *FEATURE_INPUT_COLUMNS, *EXPORT_INPUT_COLUMNS]))
+PIPELINE_STAGES = ('load', 'featurize', 'train', 'predict', 'export')
+
+
+def load_features(df: pd.DataFrame = None):
+    """
+    (X, y) for the current input, from the feature cache when the input is unchanged
+    An already loaded player table is featurized on a miss instead of parsing the input again
+    """
+    source = data_source()
+    if source is None:
+        return featurize(load_data() if df is None else df)
+    load_fn = (lambda: load_data(FEATURE_INPUT_COLUMNS)) if df is None else (lambda: df)
+    X, y, hit = cached_features(source, load_fn, featurize, FEATURE_CACHE, version_funcs=(build_features,),
+                                version=schema_version())
+    if hit:
+        print("✅ Input unchanged, loaded features from cache")
+    return X, y
+
+
+# Trees/boosting rounds a backtest chain adds per model when it continues onto the next fold
+INCREMENTAL_ROUNDS = 20
+
+# Incremental retrain (--incremental): with fewer new rows than INCREMENTAL_MIN_ROWS a full
+# retrain is cheap and exact, so it runs instead. Otherwise the saved models are continued on
+# the new rows plus INCREMENTAL_REPLAY unchanged rows per new row, and the update is dropped
+# for a full retrain if it moves the unchanged players' scores by more than
+# INCREMENTAL_MAX_DRIFT points on average
+INCREMENTAL_MIN_ROWS = 20
+INCREMENTAL_REPLAY = 9
+INCREMENTAL_MAX_DRIFT = 0.5
+
+
+# Hand-picked defaults; ml.tuning writes searched overrides to best_params.json
+DEFAULT_PARAMS = {
+    'rf': {'n_estimators': 100, 'max_depth': 10},
+    'xgb': {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1},
+    'lgb': {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1},
+}
+BEST_PARAMS_PATH = OUT_DIR / 'best_params.json'
+
+
+def load_best_params(path: Path = BEST_PARAMS_PATH) -> dict:
+    """Tuned hyperparameters per model from the last search, or {} before any search"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {name: entry['params'] for name, entry in json.load(f).get('models', {}).items()}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def model_params(name: str) -> dict:
+    """Hyperparameters make_model uses: defaults with tuned values on top"""
+    return {**DEFAULT_PARAMS[name], **load_best_params().get(name, {})}
+
+
+def make_model(name: str, n_jobs: int = 1, params: dict = None):
+    """
+    Build an untrained ensemble member with a fixed thread budget
+    params override the defaults (the tuner passes trial configs); otherwise tuned values apply
+    """
+    if name not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown model: {name}")
+    params = model_params(name) if params is None else {**DEFAULT_PARAMS[name], **params}
+    if name == 'rf':
+        return RandomForestRegressor(**params, random_state=42, n_jobs=n_jobs)
+    if name == 'xgb':
+        return XGBRegressor(**params, random_state=42, n_jobs=n_jobs)
+    # deterministic/force_row_wise keep results identical across thread counts
+    return LGBMRegressor(**params, random_state=42, n_jobs=n_jobs,
+                         deterministic=True, force_row_wise=True, verbose=-1)
+
+
+def plan_workers(n_jobs: int, workers: int = -1):
+    """Split the available cores between parallel jobs and threads per job"""
+    n_cpus = os.cpu_count() or 1
+    if workers <= 0:
+        workers = n_cpus
+    workers = max(1, min(workers, n_jobs))
+    return workers, max(1, n_cpus // workers)
+
+
+def fit_job(name, X_train, y_train, X_test=None, y_test=None, n_jobs=1):
+    """
+    Fit one model on one split (runs in a worker process)
+    Returns the fold RMSE, or the fitted model for the final fit when X_test is None
+    """
+    model = make_model(name, n_jobs)
+    with span('fit', rows=len(X_train)):
+        model.fit(X_train, y_train)
+    if X_test is None:
+        return model
+    with span('predict', rows=len(X_test)):
+        preds = model.predict(X_test)
+    return float(np.sqrt(mean_squared_error(y_test, preds)))
+
+
+def chain_job(name, X, y, folds, n_jobs=1):
+    """Fold RMSEs of one model over a chain of expanding folds, reusing the fit (runs in a worker)"""
+    return run_chain(lambda X_train, y_train: make_model(name, n_jobs).fit(X_train, y_train),
+                     lambda model, X_new, y_new: update_job(name, model, X_new, y_new, n_jobs),
+                     X, y, folds)
+
+
+def cross_validate(cache: FoldCache, workers: int = 1, refit_every: int = 1, final: bool = True):
+    """
+    Per-model fold RMSEs (and the final models fit on all rows when final=True)
+    Folds run in chains of refit_every: one fit per chain, continued on each later fold's new rows
+    """
+    chains = chain_folds(len(cache), refit_every)
+    specs = []
+    for name in MODEL_NAMES:
+        if NEEDS_SCALING[name]:
+            # Scaled models get a scaler per fold, so their folds are always fit independently
+            specs += [('fold', name, [fold]) for fold in range(len(cache))]
+        else:
+            specs += [('chain', name, chain) for chain in chains]
+    if final:
+        specs += [('final', name, None) for name in MODEL_NAMES]
+    n_workers, n_threads = plan_workers(len(specs), workers)
+    print(f"   {len(specs)} jobs on {n_workers} worker(s) x {n_threads} thread(s)")
+
+    # Each job records its fit/predict spans in its worker and returns them with its result
+    def job(kind, name, folds):
+        if kind == 'fold':
+            return delayed(collected)(fit_job, name, *cache.get(folds[0], scaled=True), n_jobs=n_threads)
+        if kind == 'chain':
+            return delayed(collected)(chain_job, name, cache.X, cache.y,
+                                      [cache.folds[f] for f in folds], n_threads)
+        return delayed(collected)(fit_job, name, *cache.full(NEEDS_SCALING[name]), n_jobs=n_threads)
+
+    # The full matrices are memory-mapped read-only into the workers instead of copied per job.
+    # Results come back in submission order, so they don't depend on scheduling
+    results = Parallel(n_jobs=n_workers, max_nbytes='1M', mmap_mode='r')(job(*spec) for spec in specs)
+
+    fold_rmses = {name: [None] * len(cache) for name in MODEL_NAMES}
+    models = {}
+    for (kind, name, folds), (result, spans) in zip(specs, results):
+        recorder().merge(spans, model=name, job=kind, folds=folds)
+        if kind == 'final':
+            models[name] = result
+        else:
+            for fold, rmse in zip(folds, result if kind == 'chain' else [result]):
+                fold_rmses[name][fold] = rmse
+    return fold_rmses, models
+
+
+def train_and_eval(X, y, workers: int = 1):
+    """Train ensemble models and evaluate performance; returns (rmses, final models, scaler)"""
+    # The player table has no time axis (rows are sorted by team/position/name), so it is
+    # validated with shuffled K-fold; real time splits live in ml.validation
+    cache = FoldCache(X, y, [(train_idx, test_idx) for _, train_idx, test_idx in static_folds(len(X))])
+    fold_rmses, models = cross_validate(cache, workers)
+    rmses = {name: float(np.mean(fold_rmses[name])) for name in MODEL_NAMES}
+
+    # Save the final models trained on all data, and the one scaler they share
+    save_bundle(models, cache.scaler, X.columns, OUT_DIR, metrics=rmses,
+                params={name: model_params(name) for name in MODEL_NAMES})
+
+    return rmses, models, cache.scaler
+
+
+def update_job(name, model, X_new, y_new, n_jobs=1, rounds=INCREMENTAL_ROUNDS):
+    """Add `rounds` trees/boosting rounds fitted on X_new (runs in a worker)"""
+    if name == 'rf':
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + rounds, n_jobs=n_jobs)
+        model.fit(X_new, y_new)
+        return model
+    update = make_model(name, n_jobs).set_params(n_estimators=rounds)
+    if name == 'xgb':
+        update.fit(X_new, y_new, xgb_model=model.get_booster())
     else:
-        # Fallback to sample data if sleeper data not available
-        with open(ROOT / 'data.json','r',encoding='utf-8') as f:
-            data = json.load(f)
-        print("Using fallback sample data")
-        return pd.DataFrame(data)
+        update.fit(X_new, y_new, init_model=getattr(model, 'booster_', model))
+    return update
 
 
-def featurize(df: pd.DataFrame) -> pd.DataFrame:
-    """Create features from real NFL player data"""
-    X = df.copy()
-    
-    # Handle missing values first
-    X['age'] = pd.to_numeric(X['age'], errors='coerce').fillna(25)
-    X['years_exp'] = pd.to_numeric(X['years_exp'], errors='coerce').fillna(0)  
-    X['weight'] = pd.to_numeric(X['weight'], errors='coerce').fillna(200)
-    X['depth_chart_order'] = pd.to_numeric(X['depth_chart_order'], errors='coerce').fillna(2)
-    
-    # Position encoding (one-hot)
-    X['pos_rb'] = (X['position']=='RB').astype(int)
-    X['pos_wr'] = (X['position']=='WR').astype(int) 
-    X['pos_qb'] = (X['position']=='QB').astype(int)
-    X['pos_te'] = (X['position']=='TE').astype(int)
-    X['pos_k'] = (X['position']=='K').astype(int)
-    X['pos_def'] = (X['position']=='DEF').astype(int)
-    
-    # Experience-based features
-    X['is_rookie'] = (X['years_exp'] == 0).astype(int)
-    X['is_veteran'] = (X['years_exp'] >= 5).astype(int)
-    X['prime_age'] = ((X['age'] >= 24) & (X['age'] <= 29)).astype(int)
-    
-    # Depth chart features (starter vs backup)
-    X['is_starter'] = (X['depth_chart_order'] == 1).astype(int)
-    X['is_backup'] = (X['depth_chart_order'] == 2).astype(int)
-    
-    # Physical features
-    X['weight_norm'] = X['weight'] / 250  # Normalize weight
-    X['age_exp_ratio'] = X['age'] / (X['years_exp'] + 1)  # Age efficiency
-    
-    # Create synthetic target based on multiple factors
-    # This is a placeholder - in real scenario you'd use historical fantasy points
-    base_score = 50
-    
-    # Position scoring adjustments
-    pos_multipliers = {'QB': 1.2, 'RB': 1.1, 'WR': 1.0, 'TE': 0.9, 'K': 0.6, 'DEF': 0.7}
-    pos_scores = X['position'].map(pos_multipliers).fillna(0.5) * 40
-    
-    # Experience bonus (peaks around 3-7 years)
-    exp_bonus = np.where(X['years_exp'] < 3, X['years_exp'] * 5,
-                np.where(X['years_exp'] <= 7, 15 + (X['years_exp'] - 3) * 2,
-                        23 - (X['years_exp'] - 7) * 1))
-    
-    # Age penalty (decline after 30)
-    age_penalty = np.where(X['age'] <= 30, 0, (X['age'] - 30) * -2)
-    
-    # Depth chart bonus (starters get big boost)
-    depth_bonus = np.where(X['depth_chart_order'] == 1, 20,
-                  np.where(X['depth_chart_order'] == 2, 5, 0))
-    
-    # Add some controlled randomness for variation
-    np.random.seed(42)
-    random_factor = np.random.normal(0, 5, len(X))
-    
-    y = base_score + pos_scores + exp_bonus + age_penalty + depth_bonus + random_factor
-    y = np.clip(y, 0, 100)  # Keep scores between 0-100
-    
-    # Select feature columns
-    feature_cols = ['age', 'years_exp', 'weight_norm', 'depth_chart_order', 'age_exp_ratio',
-                   'pos_rb', 'pos_wr', 'pos_qb', 'pos_te', 'pos_k', 'pos_def',
-                   'is_rookie', 'is_veteran', 'prime_age', 'is_starter', 'is_backup']
-    
-    X_features = X[feature_cols].fillna(0)
+def incremental_window(new_rows: np.ndarray, replay: int = INCREMENTAL_REPLAY, seed: int = 42) -> np.ndarray:
+    """Row indices an incremental update fits on: every new row plus a seeded sample of the others"""
+    new_idx = np.flatnonzero(new_rows)
+    old_idx = np.flatnonzero(~new_rows)
+    sample = np.random.RandomState(seed).choice(old_idx, min(len(old_idx), replay * len(new_idx)), replace=False)
+    return np.sort(np.concatenate([new_idx, sample]))
+
+
+def incremental_rounds(name: str, n_new: int, n_rows: int) -> int:
+    """Trees/boosting rounds an update adds: the model's own count scaled by the share of new rows"""
+    return max(1, int(np.ceil(model_params(name)['n_estimators'] * n_new / n_rows)))
+
+
+def continue_models(saved, scaler, X, y, new_rows: np.ndarray, workers: int = 1) -> dict:
+    """Saved models continued on the incremental window of new_rows (RF is updated in place)"""
+    window = incremental_window(new_rows)
+    X_window = np.ascontiguousarray(X, dtype=np.float32)[window]
+    y_window = np.asarray(y, dtype=np.float64)[window]
+    X_scaled = scaler.transform(X_window) if any(NEEDS_SCALING.values()) else None
+    n_new = int(new_rows.sum())
+
+    n_workers, n_threads = plan_workers(len(MODEL_NAMES), workers)
+    models = Parallel(n_jobs=n_workers)(
+        delayed(update_job)(name, saved[name], X_scaled if NEEDS_SCALING[name] else X_window, y_window,
+                            n_threads, incremental_rounds(name, n_new, len(X)))
+        for name in MODEL_NAMES
+    )
+    return dict(zip(MODEL_NAMES, models))
+
+
+def update_models(X, y, new_rows: np.ndarray, workers: int = 1, max_drift: float = INCREMENTAL_MAX_DRIFT):
+    """
+    Continue the saved models on the rows marked in new_rows; returns (models, scaler)
+    Returns None and leaves the bundle alone when the update moves the scores of unchanged
+    rows by more than max_drift points on average
+    """
+    from ml.inference import EnsemblePredictor
+    bundle = ModelBundle(OUT_DIR)
+    saved = bundle.models(MODEL_NAMES)
+    unchanged = np.ascontiguousarray(X, dtype=np.float32)[~new_rows]
+    before = EnsemblePredictor(saved, bundle.scaler).predict(unchanged)
+
+    models = continue_models(saved, bundle.scaler, X, y, new_rows, workers)
+    drift = float(np.mean(np.abs(EnsemblePredictor(models, bundle.scaler).predict(unchanged) - before)))
+    if drift > max_drift:
+        print(f"⚠️  Update moved unchanged players by {drift:.2f} points on average (limit {max_drift})")
+        return None
+    save_bundle(models, bundle.scaler, X.columns, OUT_DIR, metrics=bundle.metrics,
+                params={name: model_params(name) for name in MODEL_NAMES})
+    return models, bundle.scaler
+
+
+def predict_ensemble(X) -> np.ndarray:
+    """Average prediction of the saved ensemble"""
+    from ml.inference import EnsemblePredictor
+    return EnsemblePredictor.load(OUT_DIR).predict(X)
+
+
+def save_scores(df: pd.DataFrame, ensemble_pred, changelog_until):
+    """Per-player ensemble scores, the base that --delta runs patch"""
+    scores = pd.DataFrame({'player_id': df['player_id'].astype('string'), 'score': ensemble_pred})
+    scores.to_parquet(SCORES_PATH, index=False)
+    with open(SCORES_PATH.with_suffix('.json'), 'w', encoding='utf-8') as f:
+        json.dump({'rows': len(scores), 'changelog_until': changelog_until}, f, indent=2)
+
+
+def rescore_changed(df: pd.DataFrame):
+    """
+    Scores for df that only recompute players in the changelog since the last scoring
+    Returns (scores, changelog stamp, players recomputed), or None without saved scores
+    """
+    meta_path = SCORES_PATH.with_suffix('.json')
+    if not SCORES_PATH.exists() or not meta_path.exists():
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    changes, until = read_changelog(store_source(), since=meta['changelog_until'])
     
-    return X_features, y
+    # Deleted players drop out with the reindex; new players come back as NaN and are scored
+    previous = pd.read_parquet(SCORES_PATH).set_index('player_id')['score']
+    ids = df['player_id'].astype('string')
+    scores = previous.reindex(ids).to_numpy(dtype=float, copy=True)
+    recompute = ids.isin(affected_players(changes)).to_numpy() | np.isnan(scores)
+    if recompute.any():
+        scores[recompute] = predict_ensemble(build_features(df[recompute]))
+    return scores, until, int(recompute.sum())
 
 
-def train_and_eval(X,y):
-    """Train ensemble models and evaluate performance"""
-    # Use cross-validation for better evaluation
-    tscv = TimeSeriesSplit(n_splits=3)
-    rmses = {}
-    models = {}
+def parse_quota(value: str):
+    """Parse a POS=N per-position quota"""
+    pos, _, count = value.partition('=')
+    if not pos or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"expected POS=N, got {value!r}")
+    return pos.upper(), int(count)
 
-    for name, Model in [('rf', RandomForestRegressor), ('xgb', XGBRegressor), ('lgb', LGBMRegressor)]:
-        fold_rmse = []
-        model = None
-        
-        for train_idx, test_idx in tscv.split(X):
-            X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-            y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
-            
-            # Scale features
-            scaler = StandardScaler()
-            X_train_s = scaler.fit_transform(X_train)
-            X_test_s = scaler.transform(X_test)
-            
-            # Train model with better parameters
-            if name == 'rf':
-                model = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=-1)
-            elif name == 'xgb':
-                model = XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42, n_jobs=-1)
-            else:  # lgb
-                model = LGBMRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42, n_jobs=-1, verbose=-1)
-            
-            model.fit(X_train_s, y_train)
-            preds = model.predict(X_test_s)
-            rmse = np.sqrt(mean_squared_error(y_test, preds))
-            fold_rmse.append(rmse)
-        
-        rmses[name] = float(np.mean(fold_rmse))
-        models[name] = model  # Keep the last trained model
-        
-        # Save the final model trained on all data
-        final_scaler = StandardScaler()
-        X_scaled = final_scaler.fit_transform(X)
-        model.fit(X_scaled, y)
-        
-        dump(model, OUT_DIR / f'{name}.joblib')
-        dump(final_scaler, OUT_DIR / f'{name}_scaler.joblib')
-
-    return rmses
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train the ensemble and export predictions')
+    parser.add_argument('--top-k', type=int, default=300,
+                        help='number of players written to predictions.json (default: 300)')
+    parser.add_argument('--tie-break', nargs='+', default=['index'],
+                        help="export columns ordering equal scores, '-col' for descending "
+                             "(default: index, the original row order)")
+    parser.add_argument('--quota', dest='quotas', action='append', type=parse_quota, default=[],
+                        help='cap players per position, e.g. --quota K=32 --quota DEF=32')
+    parser.add_argument('--workers', type=int, default=-1,
+                        help='parallel training jobs; cores are split between jobs and '
+                             'per-model threads (default: -1, all cores)')
+    parser.add_argument('--delta', action='store_true',
+                        help='only rescore players changed since the last run (from the fetch '
+                             'changelog) with the current models, then re-export')
+    parser.add_argument('--incremental', action='store_true',
+                        help='continue the saved models on new or changed rows instead of '
+                             'retraining from scratch when few rows changed')
+    parser.add_argument('--full-retrain-ratio', type=float, default=0.5,
+                        help='with --incremental, retrain from scratch when new rows exceed this '
+                             'fraction of the rows already trained on (default: 0.5)')
+    parser.add_argument('--trace', type=Path, default=None,
+                        help='also write the run telemetry as a Chrome trace (chrome://tracing, Perfetto)')
+    stages = parser.add_mutually_exclusive_group()
+    stages.add_argument('--only', choices=PIPELINE_STAGES,
+                        help='run one stage; its inputs come from the artifacts of earlier runs')
+    stages.add_argument('--from', dest='from_stage', choices=PIPELINE_STAGES,
+                        help='run from this stage to the end, earlier outputs from saved artifacts')
+    stages.add_argument('--resume', action='store_true',
+                        help='continue after the last stage the previous run completed')
+    args = parser.parse_args(argv)
+    args.quotas = dict(args.quotas)
+    return args
 
 
 if __name__ == '__main__':
-    print("🏈 Loading NFL player data...")
-    df = load_data()
-    print(f"✅ Loaded {len(df)} players")
-    
-    print("🔧 Creating features...")
-    X, y = featurize(df)
-    print(f"✅ Created {X.shape[1]} features for {len(X)} players")
-    
-    print("🤖 Training ensemble models...")
-    rmses = train_and_eval(X, y)
-    
-    print("📊 Saving metrics...")
-    with open(OUT_DIR / 'metrics.json', 'w', encoding='utf-8') as f:
-        json.dump(rmses, f, indent=2)
-    
-    print("🎯 Generating predictions...")
-    # Reload models and generate final predictions for all players
-    from joblib import load
-    
-    # Load trained models and scalers
-    rf_model = load(OUT_DIR / 'rf.joblib')
-    xgb_model = load(OUT_DIR / 'xgb.joblib') 
-    lgb_model = load(OUT_DIR / 'lgb.joblib')
-    
-    rf_scaler = load(OUT_DIR / 'rf_scaler.joblib')
-    xgb_scaler = load(OUT_DIR / 'xgb_scaler.joblib')
-    lgb_scaler = load(OUT_DIR / 'lgb_scaler.joblib')
-    
-    # Generate ensemble predictions
-    rf_pred = rf_model.predict(rf_scaler.transform(X))
-    xgb_pred = xgb_model.predict(xgb_scaler.transform(X)) 
-    lgb_pred = lgb_model.predict(lgb_scaler.transform(X))
-    
-    # Ensemble average
-    ensemble_pred = (rf_pred + xgb_pred + lgb_pred) / 3.0
-    
-    # Set random seed for reproducible enhanced stats
-    np.random.seed(42)
-    
-    # Prepare output for the web app with enhanced stats
-    output_players = []
-    for idx, row in df.iterrows():
-        if idx < len(ensemble_pred):  # Safety check
-            injury_status = row.get('injury_status', 'Healthy')
-            if isinstance(injury_status, str):
-                injury_display = injury_status[:10] or 'Healthy'
-            else:
-                injury_display = 'Healthy'
-            
-            # Handle NaN values for depth chart
-            depth_order = row.get('depth_chart_order', 2)
-            if pd.isna(depth_order):
-                depth_order = 2
-                
-            # Calculate enhanced stats
-            base_proj = float(ensemble_pred[idx] * 0.8)
-            age = int(row.get('age', 25)) if not pd.isna(row.get('age', 25)) else 25
-            years_exp = int(row.get('years_exp', 0)) if not pd.isna(row.get('years_exp', 0)) else 0
-            
-            # Calculate ADP based on score (higher score = lower/better ADP)
-            normalized_score = (ensemble_pred[idx] - ensemble_pred.min()) / (ensemble_pred.max() - ensemble_pred.min())
-            adp = round(300 - (normalized_score * 280), 1)  # Range from ~20 to 300
-            
-            # Calculate consistency rating (0-10) based on age and experience
-            consistency = min(10, max(1, 
-                (years_exp * 1.5) + 
-                (8 if 25 <= age <= 29 else 6 if age < 25 else max(2, 8 - (age - 29)))
-            ))
-            
-            # Calculate ceiling and floor (variance based on consistency)
-            variance = 11 - consistency  # Higher consistency = lower variance
-            ceiling = base_proj + (variance * 2.5)
-            floor = max(0, base_proj - (variance * 2))
-            
-            # Position-specific stats
-            if row.get('position') in ['RB', 'QB']:
-                carries = round(max(0, 20 - (depth_order * 8) + np.random.normal(0, 3)), 1)
-                targets = round(max(0, 3 + np.random.normal(0, 2)), 1)
-            elif row.get('position') in ['WR', 'TE']:
-                carries = 0.0
-                targets = round(max(0, 8 - (depth_order * 2) + np.random.normal(0, 2)), 1)
-            else:
-                carries = 0.0
-                targets = 0.0
-            
-            # Red zone opportunities (based on position and depth)
-            if row.get('position') in ['RB', 'TE']:
-                redzone_touches = round(max(0, 3 - depth_order + np.random.normal(0, 0.5)), 1)
-            elif row.get('position') == 'WR':
-                redzone_touches = round(max(0, 2.5 - depth_order + np.random.normal(0, 0.5)), 1)
-            else:
-                redzone_touches = round(max(0, 1 + np.random.normal(0, 0.3)), 1)
-            
-            # Strength of schedule (random between 0.7-1.3, 1.0 = average)
-            sos = round(0.7 + (np.random.random() * 0.6), 2)
-            
-            # Bye week (random between 4-14)
-            bye_week = int(4 + (np.random.random() * 11))
-            
-            # Last season points (based on current projection with variance)
-            last_season = round(base_proj * 17 + np.random.normal(0, 30), 1)  # 17 games
-            last_season = max(0, last_season)
-            
-            player = {
-                'id': idx + 1,
-                'name': row.get('name', 'Unknown Player'),
-                'pos': row.get('position', 'UNK'),
-                'team': row.get('team', 'FA'),
-                'score': round(float(ensemble_pred[idx]), 1),
-                'proj': round(base_proj, 1),
-                'snap': max(1, min(100, int((3 - depth_order) * 30 + 40))),  # Snap percentage
-                'injury': injury_display,
-                'tier': min(5, max(1, int((100 - ensemble_pred[idx]) // 15) + 1)),
-                # Enhanced stats
-                'adp': adp,
-                'targets': targets,
-                'carries': carries,
-                'redzone_touches': redzone_touches,
-                'strength_of_schedule': sos,
-                'bye_week': bye_week,
-                'age': age,
-                'experience': years_exp,
-                'last_season_points': last_season,
-                'consistency_rating': round(consistency, 1),
-                'ceiling_projection': round(ceiling, 1),
-                'floor_projection': round(floor, 1)
-            }
-            output_players.append(player)
-    
-    # Sort by prediction score descending
-    output_players.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Keep top 300 for the app (manageable size)
-    output_players = output_players[:300]
-    
-    # Save predictions for the web app
-    with open(OUT_DIR / 'predictions.json', 'w', encoding='utf-8') as f:
-        json.dump(output_players, f, indent=2)
-    
-    # Also update the main data.json file for the web app
-    with open(ROOT / 'data.json', 'w', encoding='utf-8') as f:
-        json.dump(output_players, f, indent=2)
-    
-    print(f"✅ Training complete!")
-    print(f"📈 Model RMSEs: {rmses}")
-    print(f"🎯 Generated predictions for top {len(output_players)} players")
-    print(f"💾 Updated data.json for web app")
-    print(f"\n🏆 Top 10 Players:")
-    for i, player in enumerate(output_players[:10]):
-        print(f"  {i+1:2d}. {player['name']:<20} {player['pos']:<3} {player['team']:<3} {player['score']:.1f}")
+    from ml.pipeline import run_pipeline
+    run_pipeline(parse_args())
@@ -0,0 +1,244 @@
+"""
+Budgeted hyperparameter search for the ensemble members
+Each model family is searched with Hyperband: brackets of successive halving that start
+many random configs on a small budget (trees / boosting rounds) and keep the best 1/eta
+at each larger rung. Boosters stop early on a validation slice carved from each training
+fold, fold matrices are built once and memory-mapped into the worker pool for every
+trial. The hand-picked defaults are scored the same way, and only a winner that beats them
+goes to ml_output/best_params.json, which make_model picks up. The search folds use their
+own shuffle seed, so the fold RMSEs train.py reports are not the ones configs were picked on
+
+Run with: python -m ml.tuning [--models xgb lgb --eta 3 --workers -1]
+"""
+import argparse
+import json
+import math
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from joblib import Parallel, delayed
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+from ml.fold_cache import FoldCache
+from ml.train import BEST_PARAMS_PATH, DEFAULT_PARAMS, MODEL_NAMES, load_features, make_model, plan_workers
+from ml.validation import STATIC_FOLD_SEED, static_folds
+
+# ('choice', options) | ('uniform', lo, hi) | ('loguniform', lo, hi) | ('int', lo, hi)
+SEARCH_SPACES = {
+    'rf': {
+        'max_depth': ('choice', [6, 8, 10, 14, None]),
+        'min_samples_leaf': ('choice', [1, 2, 5, 10]),
+        'max_features': ('choice', [1.0, 0.7, 0.5, 'sqrt']),
+    },
+    'xgb': {
+        'max_depth': ('int', 3, 8),
+        'learning_rate': ('loguniform', 0.01, 0.3),
+        'min_child_weight': ('choice', [1, 3, 5, 10]),
+        'subsample': ('uniform', 0.6, 1.0),
+        'colsample_bytree': ('uniform', 0.6, 1.0),
+        'reg_lambda': ('loguniform', 0.1, 10.0),
+    },
+    'lgb': {
+        'num_leaves': ('choice', [15, 31, 63, 127]),
+        'max_depth': ('choice', [-1, 4, 6, 8]),
+        'learning_rate': ('loguniform', 0.01, 0.3),
+        'min_child_samples': ('choice', [5, 10, 20, 50]),
+        'subsample': ('uniform', 0.6, 1.0),
+        'colsample_bytree': ('uniform', 0.6, 1.0),
+        'reg_lambda': ('loguniform', 0.1, 10.0),
+    },
+}
+
+# (min, max) budget in trees / boosting rounds per family
+RESOURCES = {'rf': (25, 225), 'xgb': (30, 810), 'lgb': (30, 810)}
+EARLY_STOPPING_ROUNDS = 20
+# Default search seed (folds and sampling); differs from the seed of the reported folds
+TUNING_SEED = 7
+# Share of each training fold held out for early stopping (the test fold only scores)
+STOP_FRACTION = 0.15
+
+
+def sample_config(space: Dict, rng: np.random.Generator) -> Dict:
+    """One random config from a search space"""
+    config = {}
+    for param, (kind, *args) in space.items():
+        if kind == 'choice':
+            value = args[0][rng.integers(len(args[0]))]
+        elif kind == 'int':
+            value = int(rng.integers(args[0], args[1] + 1))
+        elif kind == 'uniform':
+            value = float(rng.uniform(*args))
+        elif kind == 'loguniform':
+            value = float(np.exp(rng.uniform(np.log(args[0]), np.log(args[1]))))
+        else:
+            raise ValueError(f"Unknown search dimension {kind!r} for {param}")
+        # numpy scalars from choice() don't survive json.dump
+        config[param] = value.item() if isinstance(value, np.generic) else value
+    if 'subsample' in config and 'num_leaves' in config:
+        config['subsample_freq'] = 1  # LightGBM ignores subsample without a bagging frequency
+    return config
+
+
+def tuning_folds(cache: FoldCache, seed: int = TUNING_SEED) -> List[Tuple]:
+    """(X_fit, y_fit, X_stop, y_stop, X_test, y_test) per fold, built once for all trials"""
+    rng = np.random.default_rng(seed)
+    folds = []
+    for fold in range(len(cache)):
+        X_train, y_train, X_test, y_test = cache.get(fold)
+        order = rng.permutation(len(X_train))
+        n_stop = max(1, int(len(order) * STOP_FRACTION))
+        stop, fit = np.sort(order[:n_stop]), np.sort(order[n_stop:])
+        folds.append((X_train[fit], y_train[fit], X_train[stop], y_train[stop], X_test, y_test))
+    return folds
+
+
+def fit_budgeted(name: str, params: Dict, budget: int, X_fit, y_fit, X_stop, y_stop, n_jobs: int = 1):
+    """Fit with `budget` trees/rounds; boosters stop early on the stop slice. Returns (model, rounds used)"""
+    model = make_model(name, n_jobs, dict(params, n_estimators=budget))
+    if name == 'xgb':
+        model.set_params(early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+        model.fit(X_fit, y_fit, eval_set=[(X_stop, y_stop)], verbose=False)
+        return model, model.best_iteration + 1
+    if name == 'lgb':
+        import inspect
+        import lightgbm
+        # LightGBM 4.6+ takes eval_X/eval_y and deprecates eval_set; older releases only know eval_set
+        evals = {'eval_X': (X_stop,), 'eval_y': (y_stop,)} \
+            if 'eval_X' in inspect.signature(model.fit).parameters else {'eval_set': [(X_stop, y_stop)]}
+        model.fit(X_fit, y_fit, **evals,
+                  callbacks=[lightgbm.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)])
+        return model, model.best_iteration_ or budget
+    model.fit(X_fit, y_fit)
+    return model, budget
+
+
+def trial_job(name: str, params: Dict, budget: int, folds, n_jobs: int = 1) -> Tuple[float, int]:
+    """Mean test RMSE over the folds and mean rounds used (runs in a worker process)"""
+    rmses, rounds = [], []
+    for X_fit, y_fit, X_stop, y_stop, X_test, y_test in folds:
+        model, used = fit_budgeted(name, params, budget, X_fit, y_fit, X_stop, y_stop, n_jobs)
+        rmses.append(float(np.sqrt(np.mean((y_test - model.predict(X_test)) ** 2))))
+        rounds.append(used)
+    return float(np.mean(rmses)), int(round(np.mean(rounds)))
+
+
+def hyperband_brackets(min_resource: int, max_resource: int, eta: int = 3) -> List[List[Tuple[int, int]]]:
+    """
+    Per bracket, its rungs as (configs, budget); the first bracket is the most aggressive
+    successive halving, the last runs a few configs on the full budget only
+    """
+    s_max = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        brackets.append([(max(1, n // eta ** i), int(round(max_resource * eta ** (i - s))))
+                         for i in range(s + 1)])
+    return brackets
+
+
+def tune_model(name: str, folds, parallel: Parallel, n_workers: int, eta: int = 3,
+               max_brackets: int = None, seed: int = TUNING_SEED) -> Dict:
+    """
+    Hyperband search for one family; returns the best trial, the number of trials run and
+    the RMSE of DEFAULT_PARAMS on the same folds
+    """
+    rng = np.random.default_rng(seed)
+    min_resource, max_resource = RESOURCES[name]
+    brackets = hyperband_brackets(min_resource, max_resource, eta)[:max_brackets]
+    # The defaults are a candidate too: a search that can't beat them must not replace them
+    defaults = {k: v for k, v in DEFAULT_PARAMS[name].items() if k != 'n_estimators'}
+    (default_rmse, _), = parallel([delayed(trial_job)(name, defaults, DEFAULT_PARAMS[name]['n_estimators'],
+                                                      folds, plan_workers(1, n_workers)[1])])
+    print(f"   {name.upper()} defaults: RMSE {default_rmse:.3f}")
+    best, n_trials = None, 1
+    for b, rungs in enumerate(brackets):
+        configs = [sample_config(SEARCH_SPACES[name], rng) for _ in range(rungs[0][0])]
+        for n_keep, budget in rungs:
+            configs = configs[:n_keep]
+            _, n_threads = plan_workers(len(configs), n_workers)
+            results = parallel(delayed(trial_job)(name, config, budget, folds, n_threads) for config in configs)
+            n_trials += len(configs)
+            # Stable sort: ties keep sampling order, so the search is reproducible
+            ranked = sorted(zip(results, range(len(configs))), key=lambda r: r[0][0])
+            configs = [configs[i] for _, i in ranked]
+            (rmse, rounds), _ = ranked[0]
+            if best is None or rmse < best['rmse']:
+                best = {'params': dict(configs[0], n_estimators=rounds), 'rmse': rmse, 'budget': budget}
+            print(f"   {name.upper()} bracket {b + 1}/{len(brackets)}: {len(results):>3} configs x "
+                  f"{budget:>3} rounds -> best RMSE {rmse:.3f}")
+    best['trials'] = n_trials
+    best['default_rmse'] = default_rmse
+    return best
+
+
+def save_best_params(results: Dict, path: Path = BEST_PARAMS_PATH, eta: int = 3):
+    """
+    Merge the tuned families into best_params.json (families not searched keep their entry)
+    A family whose best trial doesn't beat its defaults loses its entry, so make_model uses the defaults
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    models = dict(saved.get('models', {}))
+    for name, best in results.items():
+        if best['rmse'] < best['default_rmse']:
+            models[name] = best
+        else:
+            models.pop(name, None)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'models': models, 'search': 'hyperband', 'eta': eta,
+                   'tuned_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search ensemble hyperparameters and save the best configs')
+    parser.add_argument('--models', nargs='+', choices=MODEL_NAMES, default=list(MODEL_NAMES))
+    parser.add_argument('--eta', type=int, default=3, help='keep 1/eta configs per rung (default: 3)')
+    parser.add_argument('--max-brackets', type=int, default=None,
+                        help='only run the first N (most aggressive) Hyperband brackets')
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=TUNING_SEED,
+                        help=f'search folds and sampling seed (default: {TUNING_SEED}); '
+                             f'{STATIC_FOLD_SEED} is the split metrics.json reports on')
+    parser.add_argument('--workers', type=int, default=-1,
+                        help='parallel trial processes (default: -1, all cores)')
+    args = parser.parse_args()
+    if args.seed == STATIC_FOLD_SEED:
+        print(f"⚠️  Seed {STATIC_FOLD_SEED} tunes on the folds metrics.json reports, "
+              f"so those RMSEs will be optimistic")
+
+    X, y = load_features()
+    cache = FoldCache(X, y, [(train_idx, test_idx)
+                             for _, train_idx, test_idx in static_folds(len(X), args.folds, args.seed)])
+    folds = tuning_folds(cache, args.seed)
+    widest = max(hyperband_brackets(*RESOURCES[name], args.eta)[0][0][0] for name in args.models)
+    n_workers, _ = plan_workers(widest, args.workers)
+    print(f"🔎 Tuning {', '.join(args.models)} on {len(X)} rows x {len(folds)} folds, {n_workers} worker(s)")
+
+    # One pool for the whole search: fold matrices are memory-mapped to the workers once and
+    # the same files are reused by every later rung instead of being pickled per trial
+    results = {}
+    with Parallel(n_jobs=n_workers, max_nbytes='1M', mmap_mode='r') as parallel:
+        for name in args.models:
+            results[name] = tune_model(name, folds, parallel, n_workers, args.eta, args.max_brackets, args.seed)
+    save_best_params(results, eta=args.eta)
+
+    print(f"💾 Saved best params to {BEST_PARAMS_PATH}")
+    for name, best in results.items():
+        if best['rmse'] < best['default_rmse']:
+            print(f"   {name.upper()}: RMSE {best['rmse']:.3f} (defaults {best['default_rmse']:.3f}) "
+                  f"after {best['trials']} trials, {best['params']}")
+        else:
+            print(f"   {name.upper()}: no config beat the defaults ({best['default_rmse']:.3f}), keeping them")
+
+
+if __name__ == '__main__':
+    main()
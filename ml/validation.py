@@ -0,0 +1,135 @@
+"""
+Validation splits that follow real time instead of row order
+Rolling-origin folds over (season, week) keys train on every week up to an origin t and
+test on the next h weeks. By default every fold is fit from scratch. With --refit-every N,
+consecutive folds are grouped into chains that fit once and then continue the same model
+as the window grows: one full fit per chain plus a few incremental rounds per fold, much
+cheaper, but continued boosters score worse than refits, so it is a quick check rather
+than the number to report
+
+Backtest on the history features with: python -m ml.validation [--horizon 1 --refit-every 1]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+
+ROOT = Path(__file__).resolve().parents[1]
+if __package__ in (None, ''):
+    # Allow running as a script as well as with `python -m`
+    sys.path.insert(0, str(ROOT))
+
+WEEKS_PER_SEASON = 17
+# Shuffle seed of the folds train.py reports in metrics.json; searches use a different split
+STATIC_FOLD_SEED = 42
+
+
+def period_index(keys: pd.DataFrame) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """Per-row ordinal of its (season, week) and the sorted distinct periods"""
+    stamp = keys['season'].to_numpy(dtype=np.int64) * 100 + keys['week'].to_numpy(dtype=np.int64)
+    stamps, index = np.unique(stamp, return_inverse=True)
+    return index, [(int(s // 100), int(s % 100)) for s in stamps]
+
+
+def rolling_origin_folds(keys: pd.DataFrame, horizon: int = 1, min_train_periods: int = WEEKS_PER_SEASON,
+                         step: int = 1, max_folds: Optional[int] = None):
+    """
+    (origin, train_idx, test_idx) per fold: train on periods <= origin, test on the next `horizon`
+    Origins start once `min_train_periods` weeks are available; max_folds keeps the latest ones
+    """
+    index, periods = period_index(keys)
+    origins = list(range(min_train_periods - 1, len(periods) - horizon, step))
+    if max_folds is not None:
+        origins = origins[-max_folds:]
+    # Rows grouped by period once, so every fold is a concatenation of ready index blocks
+    order = np.argsort(index, kind='stable')
+    bounds = np.searchsorted(index[order], np.arange(len(periods) + 1))
+    folds = []
+    for o in origins:
+        train_idx = np.sort(order[:bounds[o + 1]])
+        test_idx = np.sort(order[bounds[o + 1]:bounds[o + 1 + horizon]])
+        folds.append((periods[o], train_idx, test_idx))
+    return folds
+
+
+def static_folds(n_rows: int, n_splits: int = 3, seed: int = STATIC_FOLD_SEED):
+    """Shuffled K-fold for tables without a time axis (row order carries no meaning there)"""
+    kfold = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return [(None, train_idx, test_idx) for train_idx, test_idx in kfold.split(np.arange(n_rows))]
+
+
+def chain_folds(n_folds: int, refit_every: int = 1) -> List[List[int]]:
+    """Consecutive fold numbers grouped into chains that share one fitted model"""
+    refit_every = max(1, refit_every)
+    return [list(range(i, min(i + refit_every, n_folds))) for i in range(0, n_folds, refit_every)]
+
+
+def run_chain(fit_fn, update_fn, X, y, folds) -> List[float]:
+    """
+    Fold RMSEs for one chain of expanding folds
+    The first fold fits from scratch; each later fold continues that model for a few extra
+    rounds/trees over its (grown) training window instead of refitting. Continuing on the
+    newest week alone is cheaper still, but drifts the boosters toward that one week
+    """
+    from ml.telemetry import span
+    model, rmses = None, []
+    for step, (train_idx, test_idx) in enumerate(folds):
+        with span('fit', rows=len(train_idx), step=step, update=model is not None):
+            if model is None:
+                model = fit_fn(X[train_idx], y[train_idx])
+            else:
+                model = update_fn(model, X[train_idx], y[train_idx])
+        with span('predict', rows=len(test_idx), step=step):
+            preds = model.predict(X[test_idx])
+        rmses.append(float(np.sqrt(np.mean((np.asarray(y[test_idx]) - preds) ** 2))))
+    return rmses
+
+
+def main():
+    from ml.fold_cache import FoldCache
+    from ml.history import KEY_COLUMNS, TARGET, load_history_features
+    from ml.train import MODEL_NAMES, OUT_DIR, cross_validate
+
+    parser = argparse.ArgumentParser(description='Rolling-origin backtest on the player-week history features')
+    parser.add_argument('--horizon', type=int, default=1, help='weeks tested after each origin')
+    parser.add_argument('--step', type=int, default=1, help='weeks between origins')
+    parser.add_argument('--min-train-weeks', type=int, default=WEEKS_PER_SEASON)
+    parser.add_argument('--max-folds', type=int, default=None)
+    parser.add_argument('--refit-every', type=int, default=1,
+                        help='folds per chain; models are refit from scratch once per chain '
+                             '(default: 1, every fold; larger is faster but continued boosters score worse)')
+    parser.add_argument('--workers', type=int, default=-1)
+    args = parser.parse_args()
+
+    history = load_history_features()
+    if history.empty:
+        print("⚠️  No history features yet, run python -m ml.history first")
+        return
+    keys = history[KEY_COLUMNS]
+    X = history.drop(columns=KEY_COLUMNS + [TARGET])
+    y = history[TARGET].to_numpy(dtype=np.float64)
+    folds = rolling_origin_folds(keys, args.horizon, args.min_train_weeks, args.step, args.max_folds)
+    print(f"🔁 Backtest: {len(folds)} rolling-origin folds over {len(history)} player-weeks")
+
+    cache = FoldCache(X, y, [(train_idx, test_idx) for _, train_idx, test_idx in folds])
+    fold_rmses, _ = cross_validate(cache, workers=args.workers, refit_every=args.refit_every, final=False)
+    report = {
+        'folds': [{'origin': list(origin), 'test_rows': len(test_idx),
+                   **{name: fold_rmses[name][i] for name in MODEL_NAMES}}
+                  for i, (origin, _, test_idx) in enumerate(folds)],
+        'rmse': {name: float(np.mean(fold_rmses[name])) for name in MODEL_NAMES},
+        'horizon': args.horizon,
+        'refit_every': args.refit_every,
+    }
+    with open(OUT_DIR / 'backtest.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    for name, rmse in report['rmse'].items():
+        print(f"   {name.upper()}: {rmse:.2f}")
+
+
+if __name__ == '__main__':
+    main()
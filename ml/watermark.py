@@ -0,0 +1,55 @@
+"""
+Training watermark: which rows the saved models have already seen
+Stored next to metrics.json as watermark.json (metadata) + watermark_keys.npy (row key hashes)
+A row key hashes the identifying columns together with the values the model reads, so a
+player whose inputs changed since the last run counts as new and is trained on again. The
+earlier version stays in the trees the models already have, so an occasional run without
+--incremental is still what keeps them identical to a from-scratch fit
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Columns identifying a row; player-week tables add season/week to player_id
+KEY_COLUMNS = ('player_id', 'season', 'week')
+
+
+def row_keys(df: pd.DataFrame, value_columns=()) -> np.ndarray:
+    """64-bit hash of each row's identifying columns and value_columns"""
+    cols = [c for c in KEY_COLUMNS if c in df.columns] or list(df.columns)
+    cols += [c for c in value_columns if c in df.columns and c not in cols]
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+
+
+def load_watermark(out_dir: Path):
+    """Watermark of the last training run, or None if there is none"""
+    meta_path = out_dir / 'watermark.json'
+    keys_path = out_dir / 'watermark_keys.npy'
+    if not meta_path.exists() or not keys_path.exists():
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        watermark = json.load(f)
+    watermark['keys'] = np.load(keys_path)
+    return watermark
+
+
+def new_row_mask(keys: np.ndarray, watermark) -> np.ndarray:
+    """True for rows the saved models have not been trained on (new or changed)"""
+    return ~np.isin(keys, watermark['keys'])
+
+
+def save_watermark(out_dir: Path, keys: np.ndarray, features, mode: str, new_rows: int, params=None):
+    """Record the rows covered by the saved models after a full or incremental run"""
+    np.save(out_dir / 'watermark_keys.npy', np.unique(keys))
+    meta = {
+        'rows': int(len(np.unique(keys))),
+        'features': list(features),
+        'params': params,
+        'mode': mode,
+        'new_rows': int(new_rows),
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    with open(out_dir / 'watermark.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
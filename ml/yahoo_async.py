@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+import httpx
+from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+from .yahoo_client import FANTASY_BASE, YAHOO_BURST, YAHOO_RATE_PER_SEC, YAHOO_TOKEN_URL
+
+load_dotenv()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Retry transport errors (connection, timeout), 429 and 5xx; other client errors can't succeed"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class AsyncTokenBucket:
+    """Token bucket for coroutines: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate=YAHOO_RATE_PER_SEC, capacity=YAHOO_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncYahooOAuthClient:
+    """Asyncio Yahoo OAuth2 client: same surface as YahooOAuthClient on a pooled httpx.AsyncClient."""
+
+    def __init__(self, client_id=None, client_secret=None, access_token=None, refresh_token=None,
+                 rate_limiter=None, max_connections=16):
+        self.client_id = client_id or os.getenv('YAHOO_CLIENT_ID')
+        self.client_secret = client_secret or os.getenv('YAHOO_CLIENT_SECRET')
+        self.access_token = access_token or os.getenv('YAHOO_ACCESS_TOKEN')
+        self.refresh_token = refresh_token or os.getenv('YAHOO_REFRESH_TOKEN')
+        self.rate_limiter = rate_limiter or AsyncTokenBucket()
+        self._refresh_lock = asyncio.Lock()
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = httpx.AsyncClient(timeout=20, limits=limits)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _auth_headers(self):
+        return {'Authorization': f'Bearer {self.access_token}'} if self.access_token else {}
+
+    async def _token_request(self, data):
+        data = dict(data, client_id=self.client_id, client_secret=self.client_secret)
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        r = await self.client.post(YAHOO_TOKEN_URL, data=data, headers=headers)
+        r.raise_for_status()
+        return r.json()
+
+    async def fetch_token_with_code(self, code, redirect_uri):
+        tok = await self._token_request({
+            'grant_type': 'authorization_code',
+            'code': code,
+            'redirect_uri': redirect_uri,
+        })
+        self.access_token = tok.get('access_token')
+        self.refresh_token = tok.get('refresh_token')
+        return tok
+
+    async def refresh(self):
+        if not self.refresh_token:
+            raise RuntimeError('No refresh token available')
+        tok = await self._token_request({'grant_type': 'refresh_token', 'refresh_token': self.refresh_token})
+        self.access_token = tok.get('access_token')
+        if 'refresh_token' in tok:
+            self.refresh_token = tok.get('refresh_token')
+        return tok
+
+    async def _refresh_once(self, stale_token):
+        # Calls that hit 401 together wait here; only the first one actually refreshes
+        async with self._refresh_lock:
+            if self.access_token == stale_token:
+                await self.refresh()
+
+    async def _send(self, method, url, **kwargs):
+        await self.rate_limiter.acquire()
+        token = self.access_token
+        r = await self.client.request(method, url, headers=self._auth_headers(), **kwargs)
+        if r.status_code == 401 and self.refresh_token:
+            await self._refresh_once(token)
+            await self.rate_limiter.acquire()
+            r = await self.client.request(method, url, headers=self._auth_headers(), **kwargs)
+        # 429 and 5xx raise to trigger retry/backoff; other errors fail on the first attempt
+        r.raise_for_status()
+        return r
+
+    async def _request(self, method, path, **kwargs):
+        retrying = AsyncRetrying(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10),
+                                 retry=retry_if_exception(is_retryable), reraise=True)
+        async for attempt in retrying:
+            with attempt:
+                r = await self._send(method, FANTASY_BASE + path, **kwargs)
+        return r.json()
+
+    async def get(self, path, params=None):
+        return await self._request('GET', path, params=params)
+
+    async def post(self, path, data=None):
+        return await self._request('POST', path, data=data)
@@ -1,6 +1,8 @@
 import os
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode
 from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -10,15 +12,49 @@ load_dotenv()
 YAHOO_TOKEN_URL = 'https://api.login.yahoo.com/oauth2/get_token'
 FANTASY_BASE = 'https://fantasysports.yahooapis.com/fantasy/v2'
 
+# Default request budget; Yahoo does not publish its quota, so stay well under it
+YAHOO_RATE_PER_SEC = 4.0
+YAHOO_BURST = 8
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate=YAHOO_RATE_PER_SEC, capacity=YAHOO_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class YahooOAuthClient:
     """Simple Yahoo OAuth2 client for Fantasy API with auto-refresh and retry."""
 
-    def __init__(self, client_id=None, client_secret=None, access_token=None, refresh_token=None):
+    def __init__(self, client_id=None, client_secret=None, access_token=None, refresh_token=None,
+                 rate_limiter=None, pool_size=16):
         self.client_id = client_id or os.getenv('YAHOO_CLIENT_ID')
         self.client_secret = client_secret or os.getenv('YAHOO_CLIENT_SECRET')
         self.access_token = access_token or os.getenv('YAHOO_ACCESS_TOKEN')
         self.refresh_token = refresh_token or os.getenv('YAHOO_REFRESH_TOKEN')
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self._refresh_lock = threading.Lock()
         self.session = requests.Session()
+        # Keep-alive pool sized for concurrent callers sharing this session
+        self.session.mount('https://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
         if self.access_token:
             self.session.headers.update({'Authorization': f'Bearer {self.access_token}'})
 
@@ -67,14 +103,27 @@ class YahooOAuthClient:
         self.session.headers.update({'Authorization': f'Bearer {self.access_token}'})
         return tok
 
+    def _refresh_once(self, stale_token):
+        """Refresh unless another caller already replaced stale_token (one refresh per expiry)"""
+        with self._refresh_lock:
+            if self.access_token == stale_token:
+                self.refresh()
+
+    def _send(self, method, url, **kwargs):
+        self.rate_limiter.acquire()
+        token = self.access_token
+        r = self.session.request(method, url, timeout=20, **kwargs)
+        if r.status_code == 401 and self.refresh_token:
+            # try refreshing once
+            self._refresh_once(token)
+            self.rate_limiter.acquire()
+            r = self.session.request(method, url, timeout=20, **kwargs)
+        return r
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10), retry=retry_if_exception_type(requests.exceptions.RequestException))
     def get(self, path, params=None):
         url = FANTASY_BASE + path
-        r = self.session.get(url, params=params, timeout=20)
-        if r.status_code == 401 and self.refresh_token:
-            # try refreshing once
-            self.refresh()
-            r = self.session.get(url, params=params, timeout=20)
+        r = self._send('GET', url, params=params)
         if r.status_code == 429:
             # rate limited - raise to trigger retry/backoff
             r.raise_for_status()
@@ -84,9 +133,6 @@ class YahooOAuthClient:
 
     def post(self, path, data=None):
         url = FANTASY_BASE + path
-        r = self.session.post(url, data=data)
-        if r.status_code == 401 and self.refresh_token:
-            self.refresh()
-            r = self.session.post(url, data=data)
+        r = self._send('POST', url, data=data)
         r.raise_for_status()
         return r.json()
@@ -0,0 +1,182 @@
+"""
+Iterative flattener for Yahoo Fantasy JSON responses
+Yahoo nests resources as lists of attribute dicts and collections as {"0": ..., "1": ..., "count": n};
+a path spec is compiled once and walked without recursion, so one extractor per endpoint
+replaces the hand-written walks. It runs at about the speed of those loops: the time goes
+into the per-field dict work either way
+"""
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+WILDCARD = '*'     # every item of a collection (or list)
+DESCENDANTS = '**'  # every node below, at any depth
+
+
+def compile_path(spec: str) -> Tuple[str, ...]:
+    """'fantasy_content.team.roster.*.players.*.player' -> steps"""
+    return tuple(step for step in spec.split('.') if step)
+
+
+def _child(node, key: str):
+    """node[key], looking through Yahoo's lists of single-purpose dicts"""
+    if isinstance(node, dict):
+        return node.get(key)
+    if isinstance(node, list):
+        for item in node:
+            if isinstance(item, dict) and key in item:
+                return item[key]
+    return None
+
+
+def _items(node):
+    """(key, item) pairs of a collection; the 'count' entry is skipped"""
+    if isinstance(node, dict):
+        return [(k, v) for k, v in node.items() if k != 'count']
+    if isinstance(node, list):
+        return list(enumerate(node))
+    return []
+
+
+def iter_matches(root, steps: Tuple[str, ...], track_keys: bool = True):
+    """
+    (wildcard keys, node) for every node matched by the steps
+    Breadth-first over an explicit frontier, so depth is not limited by recursion
+    """
+    frontier = [((), root)]
+    for step in steps:
+        nxt = []
+        if step == WILDCARD:
+            for keys, node in frontier:
+                if track_keys:
+                    nxt.extend((keys + (k,), item) for k, item in _items(node))
+                else:
+                    nxt.extend((keys, item) for _, item in _items(node))
+        elif step == DESCENDANTS:
+            # Descendant search: the next step is then looked up at every depth
+            # (lists are walked through but only dicts are emitted, so nothing matches twice)
+            stack = list(reversed(frontier))
+            while stack:
+                keys, node = stack.pop()
+                if isinstance(node, dict):
+                    nxt.append((keys, node))
+                stack.extend(reversed([(keys, item) for _, item in _items(node)
+                                       if isinstance(item, (dict, list))]))
+        else:
+            for keys, node in frontier:
+                child = _child(node, step)
+                if child is not None:
+                    nxt.append((keys, child))
+        frontier = nxt
+    return frontier
+
+
+def merge_resource(node) -> Dict:
+    """Collapse a resource ([[{a}, {b}, []], {sub}, ...] or a dict) into one flat dict"""
+    if isinstance(node, dict):
+        return node
+    record = {}
+    if not isinstance(node, list):
+        return record
+    # Yahoo only nests one level ([[attrs], {sub}, ...]); deeper lists fall back to a stack
+    pending = []
+    for item in node:
+        if isinstance(item, dict):
+            record.update(item)
+        elif isinstance(item, list):
+            for sub in item:
+                if isinstance(sub, dict):
+                    record.update(sub)
+                elif isinstance(sub, list):
+                    pending.append(sub)
+    while pending:
+        for sub in pending.pop():
+            if isinstance(sub, dict):
+                record.update(sub)
+            elif isinstance(sub, list):
+                pending.append(sub)
+    return record
+
+
+def _lookup(record: Dict, field: Tuple[str, ...]):
+    value = record
+    for key in field:
+        value = _child(value, key)
+        if value is None:
+            return None
+    return value
+
+
+class Flattener:
+    """
+    Compiled extractor: one row per node matched by `path`
+    `fields` maps output column -> dotted path inside the record ('$0', '$1' = wildcard keys);
+    `stats` points at a Yahoo stats list, expanded into stat_<id> columns
+    """
+
+    def __init__(self, path: str, fields: Dict[str, str], stats: Optional[str] = None):
+        self.steps = compile_path(path)
+        self.fields = [(name, int(spec[1:]) if spec.startswith('$') else compile_path(spec))
+                       for name, spec in fields.items()]
+        self.stats = compile_path(stats) if stats else None
+
+    def columns(self, resp) -> Dict[str, List]:
+        """Column arrays for one response; a stat_<id> column is None for players without that stat"""
+        out = {name: [] for name, _ in self.fields}
+        stats = {}
+        track_keys = any(isinstance(field, int) for _, field in self.fields)
+        n = 0
+        for keys, node in iter_matches(resp, self.steps, track_keys=track_keys):
+            record = merge_resource(node)
+            for name, field in self.fields:
+                if isinstance(field, int):
+                    out[name].append(keys[field] if field < len(keys) else None)
+                else:
+                    out[name].append(_lookup(record, field))
+            if self.stats:
+                for entry in _lookup(record, self.stats) or ():
+                    stat = entry.get('stat', entry) if isinstance(entry, dict) else None
+                    if isinstance(stat, dict):
+                        stats.setdefault(stat.get('stat_id'), {})[n] = stat.get('value')
+            n += 1
+        for stat_id, values in stats.items():
+            out[f"stat_{stat_id}"] = [values.get(i) for i in range(n)]
+        return out
+
+    def records(self, resp) -> List[Dict]:
+        cols = self.columns(resp)
+        return [dict(zip(cols, row)) for row in zip(*cols.values())]
+
+    def frame(self, resp) -> pd.DataFrame:
+        """DataFrame of the matched rows; stat columns are made numeric"""
+        df = pd.DataFrame(self.columns(resp))
+        stat_cols = [c for c in df.columns if c.startswith('stat_')]
+        df[stat_cols] = df[stat_cols].apply(pd.to_numeric, errors='coerce')
+        return df
+
+
+PLAYER_FIELDS = {
+    'player_key': 'player_key',
+    'name': 'name.full',
+    'team': 'editorial_team_abbr',
+    'position': 'display_position',
+}
+
+# /game/{game}/players
+GAME_PLAYERS = Flattener('fantasy_content.game.players.*.player', dict(
+    PLAYER_FIELDS, status='status', injury_note='injury_note'))
+
+# /team/{team}/roster
+ROSTER = Flattener('fantasy_content.team.roster.*.players.*.player', dict(
+    PLAYER_FIELDS, selected_position='selected_position.position'))
+
+# /players;player_keys=.../stats
+PLAYER_STATS = Flattener('fantasy_content.players.*.player', PLAYER_FIELDS, stats='player_stats.stats')
+
+# /league/{league}/scoreboard: one row per team per matchup
+MATCHUPS = Flattener('fantasy_content.league.scoreboard.*.matchups.*.matchup.*.teams.*.team', {
+    'matchup': '$1',
+    'team_key': 'team_key',
+    'name': 'name',
+    'points': 'team_points.total',
+    'projected_points': 'team_projected_points.total',
+})
@@ -1,17 +1,43 @@
-from urllib.parse import quote_plus
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, quote_plus
+import pandas as pd
 from .yahoo_client import YahooOAuthClient
+from .yahoo_flatten import PLAYER_STATS
 
+# Yahoo's players collection accepts at most this many player keys per call
+MAX_PLAYER_KEYS = 25
 
-def get_league_meta(client: YahooOAuthClient, game_code: str, season: int):
+
+class PartialStatsError(RuntimeError):
+    # Some stat batches failed; .frame holds the rows that did arrive, .failed_keys the rest
+    def __init__(self, frame, failed_keys, errors):
+        super().__init__(f"{len(failed_keys)} player keys failed in {len(errors)} batch(es): {errors[0]}")
+        self.frame = frame
+        self.failed_keys = failed_keys
+        self.errors = errors
+
+
+def league_meta_path(game_code: str, season: int):
     # Example: /game/{game_key}/leagues
-    path = f"/game/{quote_plus(game_code)}/leagues;season={season}?format=json"
-    return client.get(path)
+    return f"/game/{quote_plus(game_code)}/leagues;season={season}?format=json"
 
 
-def get_team_roster(client: YahooOAuthClient, team_key: str):
+def team_roster_path(team_key: str):
     # team_key e.g. "nfl.l.123456.t.1"
-    path = f"/team/{quote_plus(team_key)}/roster?format=json"
-    return client.get(path)
+    return f"/team/{quote_plus(team_key)}/roster?format=json"
+
+
+def matchups_path(league_key: str):
+    return f"/league/{quote_plus(league_key)}/scoreboard?format=json"
+
+
+def get_league_meta(client: YahooOAuthClient, game_code: str, season: int):
+    return client.get(league_meta_path(game_code, season))
+
+
+def get_team_roster(client: YahooOAuthClient, team_key: str):
+    return client.get(team_roster_path(team_key))
 
 
 def get_player_stats(client: YahooOAuthClient, player_ids, season=None, week=None):
@@ -23,8 +49,93 @@ def get_player_stats(client: YahooOAuthClient, player_ids, season=None, week=Non
     return client.get(path, params=params)
 
 
+def player_stats_path(player_keys, season=None, week=None):
+    # e.g. /players;player_keys=nfl.p.30123,nfl.p.31002/stats;type=week;week=3
+    keys = quote(','.join(map(str, player_keys)), safe=',')
+    scope = f";type=week;week={week}" if week else (f";type=season;season={season}" if season else '')
+    return f"/players;player_keys={keys}/stats{scope}?format=json"
+
+
+def parse_player_stats(resp):
+    # One dict per player: player_key, name, team, position and a stat_<id> per stat
+    return PLAYER_STATS.records(resp)
+
+
+def get_player_stats_bulk(client: YahooOAuthClient, player_keys, season=None, week=None, max_workers=8):
+    # Maximal 25-key batches run concurrently on the client's pooled session; the client's
+    # token bucket paces them and a 401 burst triggers a single shared token refresh.
+    # A failed batch doesn't stop the others, but once they finish PartialStatsError is raised
+    # with the rows that did arrive, so missing players are never silently dropped
+    keys = list(dict.fromkeys(map(str, player_keys)))
+    batches = [keys[i:i + MAX_PLAYER_KEYS] for i in range(0, len(keys), MAX_PLAYER_KEYS)]
+
+    def fetch(batch):
+        try:
+            return parse_player_stats(client.get(player_stats_path(batch, season, week))), None
+        except Exception as e:
+            print(f"Yahoo stats batch {batch[0]}..{batch[-1]} error: {e}")
+            return [], e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        results = list(pool.map(fetch, batches))
+    rows = [row for batch_rows, _ in results for row in batch_rows]
+    df = pd.DataFrame(rows, columns=None if rows else ['player_key', 'name', 'team', 'position'])
+    stat_cols = [c for c in df.columns if c.startswith('stat_')]
+    df[stat_cols] = df[stat_cols].apply(pd.to_numeric, errors='coerce')
+    failed = [(batch, error) for batch, (_, error) in zip(batches, results) if error is not None]
+    if failed:
+        raise PartialStatsError(df, [key for batch, _ in failed for key in batch],
+                                [error for _, error in failed])
+    return df
+
+
 def get_matchups(client: YahooOAuthClient, league_key: str, week=None):
-    path = f"/league/{quote_plus(league_key)}/scoreboard?format=json"
     params = {}
     if week: params['week'] = week
-    return client.get(path, params=params)
+    return client.get(matchups_path(league_key), params=params)
+
+
+# Async variants for AsyncYahooOAuthClient (ml.yahoo_async); the fan-outs run every call
+# concurrently, paced by the client's rate limiter, with exceptions returned in place
+
+async def gather_calls(calls):
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+async def get_league_meta_async(client, game_code: str, season: int):
+    return await client.get(league_meta_path(game_code, season))
+
+
+async def get_team_roster_async(client, team_key: str):
+    return await client.get(team_roster_path(team_key))
+
+
+async def get_matchups_async(client, league_key: str, week=None):
+    params = {'week': week} if week else {}
+    return await client.get(matchups_path(league_key), params=params)
+
+
+def league_team_keys(league_key: str, metadata):
+    # /league/{key}/metadata -> fantasy_content.league[0].num_teams; teams are numbered from 1
+    league = metadata.get('fantasy_content', {}).get('league', [{}])
+    num_teams = int((league[0] if isinstance(league, list) else league).get('num_teams', 0))
+    return [f"{league_key}.t.{n}" for n in range(1, num_teams + 1)]
+
+
+async def get_league_rosters_async(client, league_keys):
+    # {team_key: roster response or exception} for every team of every league
+    metas = await gather_calls(client.get(f"/league/{quote_plus(k)}/metadata?format=json") for k in league_keys)
+    team_keys = []
+    for league_key, meta in zip(league_keys, metas):
+        if isinstance(meta, Exception):
+            print(f"Yahoo league {league_key} error: {meta}")
+            continue
+        team_keys.extend(league_team_keys(league_key, meta))
+    rosters = await gather_calls(get_team_roster_async(client, k) for k in team_keys)
+    return dict(zip(team_keys, rosters))
+
+
+async def get_matchups_many_async(client, league_keys, week=None):
+    # {league_key: scoreboard response or exception}
+    results = await gather_calls(get_matchups_async(client, k, week) for k in league_keys)
+    return dict(zip(league_keys, results))